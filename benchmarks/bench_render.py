@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# Benchmark de generación de etiquetas sin interfaz gráfica.
+#
+#   python benchmarks/bench_render.py                      # todos los casos
+#   python benchmarks/bench_render.py --sizes 10 1000 -o actual.json
+#   python benchmarks/bench_render.py -o nuevo.json --baseline actual.json   # contra una corrida anterior
+#   python benchmarks/bench_render.py --sizes 10000 --prefetch 256   # con proceso de prefetch
+#
+# Cada caso corre en un proceso aparte para que el pico de memoria (RSS) sea
+# solo suyo. Los resultados se escriben en JSON y, con --baseline, se comparan
+# contra una corrida anterior: el programa termina con código 1 si algún caso
+# empeora más que --tolerance.
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from etiquetas.records import ean13_checksum
+
+SIZES = (10, 1000, 10000, 100000)
+KINDS = ('ean13', 'code128', 'long_title', 'repeated')
+WORDS = ('Mesa', 'Silla', 'Librero', 'Ropero', 'Comedor', 'Cama', 'Buró', 'Sofá', 'Moderna',
+         'Reclinable', 'Matrimonial', 'Individual', 'de', 'Lujo', 'Madera', 'Pino', 'Cedro',
+         'Grande', 'Pequeño', 'Esquinero', 'Multifuncional', 'con', 'Cajones', 'Espejo')
+
+
+def ean13(rng):
+    base = ''.join(rng.choice('0123456789') for _ in range(12))
+    return base + str(ean13_checksum(base))
+
+
+def synthetic_lines(kind, size, seed=1234):
+    # Listas reproducibles: misma semilla, mismas líneas
+    rng = random.Random(seed)
+    # 'repeated': líneas con cantidad, 50 copias de cada etiqueta
+    copies = min(50, size) if kind == 'repeated' else 1
+    for _ in range(size // copies):
+        if kind == 'code128':
+            code = ''.join(rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(rng.randint(6, 15)))
+        else:
+            code = ean13(rng)
+        n_words = rng.randint(12, 24) if kind == 'long_title' else rng.randint(2, 5)
+        title = ' '.join(rng.choice(WORDS) for _ in range(n_words))
+        if kind == 'long_title':
+            title += ' ' + 'MuyCompletoParaEspaciosPequeños' * rng.randint(1, 3)
+        line = f"{code};{title};{rng.randint(99, 25000)}"
+        yield f"{line};{copies}" if copies > 1 else line
+
+
+def synthetic_assets(tmpdir):
+    # Logo grande (como una foto de teléfono) e icono, generados al vuelo
+    from PIL import Image, ImageDraw
+    logo = Image.new('RGBA', (3000, 3000), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(logo)
+    draw.ellipse((200, 200, 2800, 2800), fill=(180, 40, 40, 255))
+    draw.rectangle((900, 1200, 2100, 1800), fill=(250, 250, 250, 255))
+    icon = Image.new('RGBA', (512, 512), (0, 0, 0, 0))
+    ImageDraw.Draw(icon).ellipse((0, 0, 511, 511), fill=(37, 211, 102, 255))
+    logo_path = os.path.join(tmpdir, 'logo.png')
+    icon_path = os.path.join(tmpdir, 'icon.png')
+    logo.save(logo_path)
+    icon.save(icon_path)
+    return logo_path, icon_path
+
+
+def run_case(kind, size, logo, print_profile='production', prefetch=0):
+    from etiquetas import LabelRenderer
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if logo:
+            logo_path, icon_path = synthetic_assets(tmpdir)
+        else:
+            logo_path = icon_path = None
+        output = os.path.join(tmpdir, 'out.pdf')
+        start = time.perf_counter()
+        renderer = LabelRenderer(logo=logo_path, icon=icon_path, print_profile=print_profile, prefetch=prefetch)
+        result = renderer.render(synthetic_lines(kind, size), output)
+        elapsed = time.perf_counter() - start
+        size_bytes = os.path.getsize(output)
+    return {
+        'case': case_name(kind, size, logo, print_profile, prefetch),
+        'kind': kind,
+        'labels': result.labels,
+        'logo': logo,
+        'pages': result.pages,
+        'seconds': round(elapsed, 4),
+        'labels_per_sec': round(result.labels / elapsed, 1),
+        'ms_per_page': round(elapsed * 1000 / result.pages, 3),
+        'bytes_per_label': round(size_bytes / result.labels, 1),
+        'pdf_bytes': size_bytes,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def case_name(kind, size, logo, print_profile='production', prefetch=0):
+    name = f"{kind}-{size}-{'logo' if logo else 'sin_logo'}"
+    if print_profile != 'production':
+        name = f"{name}-{print_profile}"
+    return f"{name}-prefetch{prefetch}" if prefetch else name
+
+
+def compare(results, baseline, tolerance):
+    # Empeora si baja el rendimiento o suben bytes/etiqueta o memoria más de la tolerancia
+    previous = {r['case']: r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get(r['case'])
+        if old is None:
+            continue
+        checks = (('labels_per_sec', old['labels_per_sec'] / r['labels_per_sec']),
+                  ('bytes_per_label', r['bytes_per_label'] / old['bytes_per_label']),
+                  ('peak_rss_mb', r['peak_rss_mb'] / old['peak_rss_mb']))
+        for metric, ratio in checks:
+            status = 'PEOR' if ratio > 1 + tolerance else 'ok'
+            print(f"  {r['case']:<32} {metric:<16} {old[metric]:>12} -> {r[metric]:>12}  {status}")
+            if status != 'ok':
+                regressions.append((r['case'], metric))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de generación de etiquetas")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=KINDS)
+    parser.add_argument('-o', '--output', help="archivo JSON de resultados")
+    parser.add_argument('--baseline', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="empeoramiento permitido respecto al baseline (por defecto 0.10)")
+    parser.add_argument('--print-profile', choices=('draft', 'production'), default='production',
+                        help="perfil de impresión de los casos (por defecto: production)")
+    parser.add_argument('--prefetch', type=int, default=0, metavar='N',
+                        help="etiquetas que prepara por adelantado un proceso aparte (por defecto 0)")
+    parser.add_argument('--case', nargs=5, metavar=('KIND', 'SIZE', 'LOGO', 'PROFILE', 'PREFETCH'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        kind, size, logo, print_profile, prefetch = args.case
+        print(json.dumps(run_case(kind, int(size), logo == '1', print_profile, int(prefetch))))
+        return 0
+
+    results = []
+    for size in args.sizes:
+        for kind in args.kinds:
+            for logo in (False, True):
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--case',
+                                       kind, str(size), '1' if logo else '0', args.print_profile,
+                                       str(args.prefetch)],
+                                      capture_output=True, text=True)
+                if proc.returncode != 0:
+                    print(proc.stderr, file=sys.stderr)
+                    return 1
+                r = json.loads(proc.stdout)
+                results.append(r)
+                print(f"{r['case']:<32} {r['labels_per_sec']:>9.0f} etiq/s {r['ms_per_page']:>8.2f} ms/pág "
+                      f"{r['bytes_per_label']:>9.0f} B/etiq {r['peak_rss_mb']:>7.1f} MB")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Comparación con {args.baseline}:")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
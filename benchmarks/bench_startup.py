@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Tiempo de arranque de la interfaz gráfica, medido en procesos nuevos.
+#
+#   python benchmarks/bench_startup.py                     # 5 arranques, objetivo 400 ms
+#   python benchmarks/bench_startup.py --runs 10 --target-ms 250 -o arranque.json
+#
+# Cada arranque corre en un intérprete aparte (caché de módulos vacía) y mide
+# el import de etiquetas.app y, si hay pantalla, hasta que la ventana queda
+# dibujada. Además verifica que ReportLab, python-barcode y PIL no se carguen
+# antes de mostrar la ventana. Termina con código 1 si la mediana supera
+# --target-ms o si algún módulo pesado se importó al arrancar.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Lo que debe esperar a la primera vista previa o al primer PDF
+HEAVY_MODULES = ('reportlab.pdfgen.canvas', 'reportlab.pdfbase.pdfmetrics', 'reportlab.lib.utils',
+                 'barcode', 'PIL.Image', 'PIL.ImageTk', 'concurrent.futures.process')
+TARGET_MS = 400
+
+
+def run_once():
+    start = time.perf_counter()
+    import etiquetas.app
+    imported = time.perf_counter()
+    result = {'import_ms': round((imported - start) * 1000, 1)}
+    try:
+        app = etiquetas.app.LabelApp()
+    except Exception as e:
+        # Sin pantalla (p. ej. en un servidor) solo se mide el import
+        result['window_ms'] = None
+        result['window_error'] = str(e).splitlines()[0]
+    else:
+        # Antes de procesar eventos: el precargado en segundo plano aún no empezó
+        result['loaded'] = [name for name in HEAVY_MODULES if name in sys.modules]
+        app.update()
+        result['window_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        app.destroy()
+    result.setdefault('loaded', [name for name in HEAVY_MODULES if name in sys.modules])
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la interfaz gráfica")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=TARGET_MS,
+                        help=f"mediana máxima hasta ver la ventana (por defecto {TARGET_MS} ms)")
+    parser.add_argument('-o', '--output', help="archivo JSON de resultados")
+    parser.add_argument('--once', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.once:
+        print(json.dumps(run_once()))
+        return 0
+
+    runs = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--once'],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            return 1
+        r = json.loads(proc.stdout)
+        # Incluye el arranque del intérprete, como lo ve quien abre el programa
+        r['process_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        runs.append(r)
+
+    measured = 'window_ms' if runs[0]['window_ms'] is not None else 'import_ms'
+    median = statistics.median(r[measured] for r in runs)
+    loaded = sorted({name for r in runs for name in r['loaded']})
+    print(f"import etiquetas.app: {statistics.median(r['import_ms'] for r in runs):.1f} ms (mediana)")
+    if measured == 'window_ms':
+        print(f"ventana dibujada:     {median:.1f} ms (mediana)")
+    else:
+        print(f"sin pantalla, solo se midió el import ({runs[0]['window_error']})")
+    print(f"proceso completo:     {statistics.median(r['process_ms'] for r in runs):.1f} ms (mediana)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'target_ms': args.target_ms, 'median_ms': median, 'measured': measured,
+                       'runs': runs}, f, indent=2, ensure_ascii=False)
+    failed = False
+    if loaded:
+        print(f"PEOR: módulos pesados cargados al arrancar: {', '.join(loaded)}")
+        failed = True
+    if median > args.target_ms:
+        print(f"PEOR: {median:.1f} ms supera el objetivo de {args.target_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print(f"ok: dentro del objetivo de {args.target_ms:.0f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
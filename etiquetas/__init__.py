@@ -0,0 +1,10 @@
+from .incremental import render_incremental
+from .parallel import render_parallel
+from .records import ParseIssue, Record, parse_line, parse_records
+from .render import LabelRenderer, load_print_image
+from .sheets import SHEETS, SheetTemplate, load_sheet
+from .sources import ColumnMapping, iter_table_records
+
+__all__ = ['ColumnMapping', 'LabelRenderer', 'ParseIssue', 'Record', 'SHEETS', 'SheetTemplate',
+           'iter_table_records', 'load_print_image', 'load_sheet', 'parse_line', 'parse_records',
+           'render_incremental', 'render_parallel']
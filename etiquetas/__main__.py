@@ -0,0 +1,6 @@
+# Requisitos: pip install reportlab python-barcode Pillow
+import sys
+
+from .cli import main
+
+sys.exit(main())
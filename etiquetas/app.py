@@ -0,0 +1,529 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import tkinter as tk
+from tkinter import filedialog, messagebox, simpledialog, ttk
+
+from .parallel import iter_shards
+from .preview import PageCache, SheetPreview, page_keys
+from .records import iter_records
+from .render import DEFAULT_PRINT_PROFILE, ICON_SIZE, LOGO_SIZE, PRINT_PROFILES, LabelRenderer, RenderCancelled, \
+    load_print_image, preload
+from .sheets import DEFAULT_SHEET, SHEETS
+from .sources import SQLITE_EXTENSIONS, ColumnMapping, is_table_source, iter_table_lines, read_table, \
+    resolve_mapping, save_mapping, sqlite_tables
+from .table import LabelTable
+from .zpl import ZplRenderer
+
+class LabelApp(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Generador de Etiquetas - Muebles Carrillo")
+        self.geometry("800x600")
+        self.configure(bg="#f5f5f5")
+        self.logo_path = None
+        self.logo_img = None
+        self.logo_image = None
+        self.whatsapp_path = None
+        self.whatsapp_img = None
+        self.whatsapp_image = None
+        self._job = None
+        self._preview_window = None
+        self._preview_after = None
+        self._preview_key = None
+        self._sheet_preview = None
+        self._sheet_after = None
+        # Las hojas se arman en un hilo, una vez por vez; el renderer se reusa
+        # mientras no cambien logo, icono, hoja ni calidad
+        self._sheet_building = False
+        self._sheet_pending = False
+        self._sheet_results = queue.Queue()
+        self._sheet_renderer = None
+        # Compartido entre aperturas de la vista de hojas
+        self._page_cache = PageCache()
+
+        main_frame = tk.Frame(self, bg="#f5f5f5", padx=15, pady=15)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        title_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        title_frame.pack(fill=tk.X, pady=(0, 10))
+        title_label = tk.Label(title_frame, text="Generador de Etiquetas para Muebles Carrillo", 
+                              font=("Arial", 16, "bold"), bg="#f5f5f5")
+        title_label.pack()
+        
+        instr_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        instr_frame.pack(fill=tk.X, pady=(0, 5))
+        lbl = tk.Label(instr_frame, text="Lista de etiquetas (doble clic para editar; Ctrl+V pega líneas código;título;precio;cantidad):",
+                      font=("Arial", 10), bg="#f5f5f5")
+        lbl.pack(anchor='w')
+
+        tools_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        tools_frame.pack(fill=tk.X, pady=(0, 5))
+        self.table_info = tk.Label(tools_frame, font=("Arial", 9), bg="#f5f5f5", fg="#555555")
+        self.table = LabelTable(main_frame, on_change=self._on_table_change,
+                                on_select=self._schedule_preview, bg="#f5f5f5")
+        self.table.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        for text, command in (("Importar lista...", self.import_list), ("Pegar", self.table.paste),
+                              ("Agregar fila", self.table.add_row), ("Eliminar fila", self.table.delete_row)):
+            tk.Button(tools_frame, text=text, command=command, bg="#e0e0e0",
+                      font=("Arial", 9)).pack(side=tk.LEFT, padx=(0, 5))
+        self.table_info.pack(side=tk.RIGHT)
+        self.table.set_lines([
+            "1234567890123;Mesa de Centro Moderna;1299",
+            "ABCDE123;Silla Reclinable de Lujo;2450",
+            "9876543210987;Librero Multifuncional Grande y MuyCompletoParaEspaciosPequeños;3599",
+        ])
+
+        logos_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        logos_frame.pack(fill=tk.X, pady=10)
+        
+        logo_subframe = tk.Frame(logos_frame, bg="#f5f5f5")
+        logo_subframe.pack(side=tk.LEFT, padx=(0, 20))
+        
+        tk.Button(logo_subframe, text="Seleccionar Logo de Empresa", 
+                 command=self.select_logo, bg="#e0e0e0", 
+                 font=("Arial", 10), padx=10).pack(anchor='w')
+        self.logo_preview = tk.Label(logo_subframe, text="Logo: Ninguno", 
+                                    bg="#f5f5f5", width=30, anchor='w')
+        self.logo_preview.pack(anchor='w', pady=5)
+        
+        whatsapp_subframe = tk.Frame(logos_frame, bg="#f5f5f5")
+        whatsapp_subframe.pack(side=tk.LEFT)
+        
+        tk.Button(whatsapp_subframe, text="Seleccionar Icono WhatsApp", 
+                 command=self.select_whatsapp, bg="#e0e0e0", 
+                 font=("Arial", 10), padx=10).pack(anchor='w')
+        self.whatsapp_preview = tk.Label(whatsapp_subframe, text="Icono: Ninguno", 
+                                       bg="#f5f5f5", width=30, anchor='w')
+        self.whatsapp_preview.pack(anchor='w', pady=5)
+        
+        sheet_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        sheet_frame.pack(fill=tk.X)
+        tk.Label(sheet_frame, text="Hoja:", font=("Arial", 10), bg="#f5f5f5").pack(side=tk.LEFT)
+        self.sheet_var = tk.StringVar(value=DEFAULT_SHEET)
+        ttk.Combobox(sheet_frame, textvariable=self.sheet_var, values=list(SHEETS),
+                     state='readonly', width=20).pack(side=tk.LEFT, padx=5)
+        self.sheet_desc = tk.Label(sheet_frame, text=SHEETS[DEFAULT_SHEET].description,
+                                   font=("Arial", 9), bg="#f5f5f5", fg="#555555")
+        self.sheet_desc.pack(side=tk.LEFT)
+        self.sheet_var.trace_add('write', lambda *args: self.sheet_desc.config(
+            text=SHEETS[self.sheet_var.get()].description))
+        self.sheet_var.trace_add('write', self._schedule_sheet_preview)
+        tk.Label(sheet_frame, text="Calidad:", font=("Arial", 10), bg="#f5f5f5").pack(side=tk.LEFT, padx=(15, 0))
+        self.print_profile_var = tk.StringVar(value=DEFAULT_PRINT_PROFILE)
+        for name, profile in PRINT_PROFILES.items():
+            tk.Radiobutton(sheet_frame, text=f"{profile.dpi} dpi", variable=self.print_profile_var,
+                           value=name, bg="#f5f5f5").pack(side=tk.LEFT)
+        self.print_profile_var.trace_add('write', self._schedule_sheet_preview)
+
+        btn_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        btn_frame.pack(pady=10)
+        
+        tk.Button(btn_frame, text="Vista Previa", command=self.preview_label, 
+                 width=20, bg="#4CAF50", fg="white", 
+                 font=("Arial", 11, "bold")).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(btn_frame, text="Ver Hojas", command=self.preview_sheets,
+                 width=14, bg="#4CAF50", fg="white",
+                 font=("Arial", 11, "bold")).pack(side=tk.LEFT, padx=5)
+        
+        self.generate_btn = tk.Button(btn_frame, text="Generar PDF", command=self.generate_pdf, 
+                                     width=20, bg="#2196F3", fg="white", 
+                                     font=("Arial", 11, "bold"))
+        self.generate_btn.pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(btn_frame, text="Salir", command=self.destroy, 
+                 width=10, bg="#f44336", fg="white", 
+                 font=("Arial", 11)).pack(side=tk.LEFT, padx=5)
+
+        progress_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        progress_frame.pack(fill=tk.X)
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.progress_var = tk.StringVar()
+        tk.Label(progress_frame, textvariable=self.progress_var, bg="#f5f5f5",
+                 width=40, anchor='w').pack(side=tk.LEFT, padx=5)
+        self.cancel_btn = tk.Button(progress_frame, text="Cancelar", command=self.cancel_generation,
+                                    state=tk.DISABLED, bg="#e0e0e0", font=("Arial", 10))
+        self.cancel_btn.pack(side=tk.LEFT)
+                 
+        self.status_var = tk.StringVar()
+        self.status_var.set("Listo para generar etiquetas")
+        status_bar = tk.Label(self, textvariable=self.status_var, 
+                            bd=1, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        # Con la ventana ya dibujada se cargan ReportLab, python-barcode y PIL
+        # en segundo plano, para que la primera vista previa no los espere
+        self.after(200, lambda: threading.Thread(target=preload, daemon=True).start())
+
+    def select_logo(self):
+        path = filedialog.askopenfilename(
+            title="Seleccione archivo de logo",
+            filetypes=[("Imágenes", "*.png;*.jpg;*.jpeg;*.gif"), ("Todos", "*.*")]
+        )
+        if path:
+            try:
+                from PIL import ImageTk
+                img = load_print_image(path, LOGO_SIZE, LOGO_SIZE)
+                self.logo_image = img
+                self.logo_path = path
+                img = img.copy()
+                img.thumbnail((60, 60))
+                self.logo_img = ImageTk.PhotoImage(img)
+                self.logo_preview.config(image=self.logo_img, text="")
+                self.status_var.set(f"Logo cargado: {os.path.basename(path)}")
+                self._schedule_sheet_preview()
+            except Exception as e:
+                self.logo_path = self.logo_image = None
+                self.logo_preview.config(text=f"Error: {os.path.basename(path)}", image='')
+                self.status_var.set(f"Error al cargar logo: {str(e)}")
+        else:
+            self.logo_path = self.logo_image = None
+            self.logo_preview.config(text="Logo: Ninguno", image='')
+
+    def select_whatsapp(self):
+        path = filedialog.askopenfilename(
+            title="Seleccione icono de WhatsApp",
+            filetypes=[("Imágenes", "*.png;*.jpg;*.jpeg;*.gif"), ("Todos", "*.*")]
+        )
+        if path:
+            try:
+                from PIL import ImageTk
+                img = load_print_image(path, ICON_SIZE, ICON_SIZE)
+                self.whatsapp_image = img
+                self.whatsapp_path = path
+                img = img.copy()
+                img.thumbnail((30, 30))
+                self.whatsapp_img = ImageTk.PhotoImage(img)
+                self.whatsapp_preview.config(image=self.whatsapp_img, text="")
+                self.status_var.set(f"Icono WhatsApp cargado: {os.path.basename(path)}")
+                self._schedule_sheet_preview()
+            except Exception as e:
+                self.whatsapp_path = self.whatsapp_image = None
+                self.whatsapp_preview.config(text=f"Error: {os.path.basename(path)}", image='')
+                self.status_var.set(f"Error al cargar icono: {str(e)}")
+        else:
+            self.whatsapp_path = self.whatsapp_image = None
+            self.whatsapp_preview.config(text="Icono: Ninguno", image='')
+
+    def _renderer(self):
+        return LabelRenderer(logo=self.logo_image, icon=self.whatsapp_image, sheet=self.sheet_var.get(),
+                             print_profile=self.print_profile_var.get())
+
+    def _preview_line(self):
+        return self.table.current_line()
+
+    def _on_table_change(self):
+        self.table_info.config(text=f"{len(self.table.rows)} filas · {self.table.labels} etiquetas")
+        self._schedule_preview()
+        self._schedule_sheet_preview()
+
+    def import_list(self):
+        path = filedialog.askopenfilename(
+            title="Seleccione la lista de etiquetas",
+            filetypes=[("Listas y planillas", "*.txt;*.csv;*.tsv;*.xlsx;*.xlsm;*.sqlite;*.sqlite3;*.db"),
+                       ("Todos", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            start = time.perf_counter()
+            if is_table_source(path):
+                if not self._import_table(path):
+                    return
+            else:
+                with open(path, encoding='utf-8-sig') as f:
+                    self.table.set_lines(f)
+        except (OSError, UnicodeDecodeError, ValueError, ImportError, sqlite3.Error) as e:
+            messagebox.showerror("Error", f"No se pudo leer la lista:\n{e}")
+            return
+        self.status_var.set(f"Lista importada: {os.path.basename(path)} ({len(self.table.rows)} filas "
+                            f"en {time.perf_counter() - start:.1f} s)")
+
+    def _import_table(self, path):
+        table = None
+        if path.lower().endswith(SQLITE_EXTENSIONS):
+            tables = sqlite_tables(path)
+            if len(tables) > 1:
+                table = simpledialog.askstring("Tabla", "Tabla a importar:\n" + ", ".join(tables),
+                                               initialvalue=tables[0], parent=self)
+                if not table:
+                    return False
+        header, rows = read_table(path, table=table)
+        try:
+            initial = resolve_mapping(header)
+        except ValueError:
+            initial = None
+        mapping = self._ask_mapping(header, initial)
+        if mapping is None:
+            return False
+        save_mapping(mapping)
+        self.table.set_lines(iter_table_lines(header, rows, mapping))
+        return True
+
+    def _ask_mapping(self, header, initial=None):
+        # Diálogo para elegir qué columna de la planilla va en cada campo
+        dialog = tk.Toplevel(self)
+        dialog.title("Columnas de la planilla")
+        dialog.transient(self)
+        dialog.grab_set()
+        choices = [''] + list(header)
+        variables = {}
+        fields = (('code', "Código"), ('title', "Título"), ('price', "Precio"), ('quantity', "Cantidad (opcional)"))
+        for row, (field, label) in enumerate(fields):
+            tk.Label(dialog, text=label + ":").grid(row=row, column=0, sticky='w', padx=10, pady=4)
+            var = tk.StringVar(value=(getattr(initial, field) or '') if initial else '')
+            ttk.Combobox(dialog, textvariable=var, values=choices, state='readonly',
+                         width=30).grid(row=row, column=1, padx=10, pady=4)
+            variables[field] = var
+        result = []
+
+        def accept():
+            values = {field: var.get() or None for field, var in variables.items()}
+            if not all(values[field] for field in ('code', 'title', 'price')):
+                messagebox.showwarning("Columnas", "Elija las columnas de código, título y precio.", parent=dialog)
+                return
+            result.append(ColumnMapping(**values))
+            dialog.destroy()
+
+        buttons = tk.Frame(dialog)
+        buttons.grid(row=len(fields), column=0, columnspan=2, pady=10)
+        tk.Button(buttons, text="Importar", command=accept, width=12).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Cancelar", command=dialog.destroy, width=12).pack(side=tk.LEFT, padx=5)
+        self.wait_window(dialog)
+        return result[0] if result else None
+
+    def preview_label(self):
+        line = self._preview_line()
+        if line is None:
+            messagebox.showwarning("Advertencia", "La lista de etiquetas está vacía.")
+            return
+        if self._preview_window is None or not self._preview_window.winfo_exists():
+            self._preview_window = tk.Toplevel(self)
+            self._preview_window.title("Vista Previa de Etiqueta")
+            self._preview_image = tk.Label(self._preview_window, bg="white")
+            self._preview_image.pack(expand=True, fill=tk.BOTH)
+            self._preview_key = None
+        self._preview_window.lift()
+        self._update_preview()
+
+    def _schedule_preview(self, event=None):
+        # La vista previa abierta sigue la edición y el cursor, con un retardo
+        # para no redibujar en cada tecla
+        if self._preview_window is None or not self._preview_window.winfo_exists():
+            return
+        if self._preview_after is not None:
+            self.after_cancel(self._preview_after)
+        self._preview_after = self.after(250, self._update_preview)
+
+    def _update_preview(self):
+        self._preview_after = None
+        line = self._preview_line()
+        key = (line, id(self.logo_image), id(self.whatsapp_image))
+        if line is None or key == self._preview_key:
+            return
+        self._preview_key = key
+        try:
+            img = self._renderer().render_image(line)
+        except Exception as e:
+            self._preview_image.config(image='', text=f"Error al generar vista previa:\n{e}")
+            self._preview_image.photo = None
+            return
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(img)
+        self._preview_image.config(image=photo, text='')
+        self._preview_image.photo = photo
+        self.status_var.set("Vista previa generada")
+
+    def preview_sheets(self):
+        if not self.table.rows:
+            messagebox.showwarning("Advertencia", "La lista de etiquetas está vacía.")
+            return
+        if self._sheet_preview is None or not self._sheet_preview.winfo_exists():
+            self._sheet_preview = SheetPreview(self, self._page_cache)
+        self._sheet_preview.lift()
+        self._sheet_preview.focus_set()
+        self._update_sheet_preview()
+
+    def _schedule_sheet_preview(self, *args):
+        # Igual que la vista previa de una etiqueta: se rearma con retardo
+        # después del último cambio; las páginas que no cambiaron salen del caché
+        if self._sheet_preview is None or not self._sheet_preview.winfo_exists():
+            return
+        if self._sheet_after is not None:
+            self.after_cancel(self._sheet_after)
+        self._sheet_after = self.after(500, self._update_sheet_preview)
+
+    def _update_sheet_preview(self):
+        self._sheet_after = None
+        if self._sheet_preview is None or not self._sheet_preview.winfo_exists():
+            return
+        if self._sheet_building:
+            # Se vuelve a armar cuando termine el que está en curso
+            self._sheet_pending = True
+            return
+        self._sheet_building = True
+        # Se copian aquí: el hilo no toca la tabla ni las variables de Tk
+        args = (self.table.lines(), self.logo_image, self.whatsapp_image, self.sheet_var.get(),
+                self.print_profile_var.get())
+        threading.Thread(target=self._build_sheet_pages, args=args, daemon=True).start()
+        self.after(50, self._poll_sheet_pages)
+
+    def _build_sheet_pages(self, lines, logo, icon, sheet, print_profile):
+        try:
+            cached = self._sheet_renderer
+            if (cached is None or cached[0] is not logo or cached[1] is not icon
+                    or cached[2:4] != (sheet, print_profile)):
+                renderer = LabelRenderer(logo=logo, icon=icon, sheet=sheet, print_profile=print_profile)
+                cached = self._sheet_renderer = (logo, icon, sheet, print_profile, renderer)
+            renderer = cached[4]
+            pages = list(iter_shards(iter_records(lines), renderer.max_per_page))
+            self._sheet_results.put((renderer, pages, page_keys(renderer, pages), None))
+        except Exception as e:
+            self._sheet_results.put((None, None, None, e))
+
+    def _poll_sheet_pages(self):
+        try:
+            renderer, pages, keys, error = self._sheet_results.get_nowait()
+        except queue.Empty:
+            self.after(50, self._poll_sheet_pages)
+            return
+        self._sheet_building = False
+        if self._sheet_preview is not None and self._sheet_preview.winfo_exists():
+            if error is not None:
+                self.status_var.set(f"Error al preparar la vista de hojas: {error}")
+            else:
+                self._sheet_preview.set_pages(renderer, pages, keys)
+        if self._sheet_pending:
+            self._sheet_pending = False
+            self._update_sheet_preview()
+
+    def generate_pdf(self):
+        if self._job is not None:
+            return
+        # Las líneas se copian aquí (el hilo de trabajo no debe tocar la tabla) y
+        # los problemas salen de la validación que cada fila ya tiene
+        lines = self.table.lines()
+        issues = self.table.issues()
+        if not lines:
+            messagebox.showwarning("Advertencia", "La lista de etiquetas está vacía.")
+            return
+        if issues and not self._confirm_issues(issues):
+            self.status_var.set(f"Generación detenida: {len(issues)} problemas en la lista")
+            return
+        total = self.table.printable_labels()
+        if not total:
+            messagebox.showwarning("Advertencia", "Todas las líneas tienen errores; no hay etiquetas para generar.")
+            return
+        out_path = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            filetypes=[("PDF files","*.pdf"), ("ZPL para impresora Zebra", "*.zpl")]
+        )
+        if not out_path:
+            return
+        try:
+            if out_path.lower().endswith('.zpl'):
+                renderer = ZplRenderer(logo=self.logo_image, icon=self.whatsapp_image)
+            else:
+                renderer = self._renderer()
+        except Exception as e:
+            self.status_var.set(f"Error al generar PDF: {str(e)}")
+            messagebox.showerror("Error", f"Ocurrió un error:\n{e}")
+            return
+        events = queue.Queue()
+        cancel = threading.Event()
+        self._job = {'path': out_path, 'total': total, 'start': time.perf_counter(),
+                     'events': events, 'cancel': cancel}
+        self.progress.config(maximum=total, value=0)
+        self.progress_var.set(f"0/{total} etiquetas")
+        self.generate_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.status_var.set("Generando PDF...")
+        threading.Thread(target=self._generate_worker, args=(renderer, lines, out_path, events, cancel),
+                         daemon=True).start()
+        self.after(100, self._poll_generation)
+
+    def _confirm_issues(self, issues, limit=15):
+        errors = sum(1 for issue in issues if issue.severity == 'error')
+        shown = "\n".join(str(issue) for issue in issues[:limit])
+        if len(issues) > limit:
+            shown += f"\n... y {len(issues) - limit} más"
+        ask = messagebox.askyesno if errors else messagebox.askokcancel
+        return ask("Revisar lista",
+                   f"Se encontraron {errors} errores y {len(issues) - errors} avisos:\n\n{shown}\n\n"
+                   + ("¿Generar el PDF sin las líneas con errores?" if errors else "¿Generar el PDF de todos modos?"),
+                   icon=messagebox.WARNING)
+
+    @staticmethod
+    def _generate_worker(renderer, lines, out_path, events, cancel):
+        progress = lambda n: events.put(('progress', n))
+        try:
+            # iter_records deja afuera las filas con errores
+            result = renderer.render(iter_records(lines), out_path, progress=progress, cancel=cancel)
+            events.put(('done', result))
+        except RenderCancelled:
+            events.put(('cancelled', None))
+        except Exception as e:
+            events.put(('error', e))
+
+    def _poll_generation(self):
+        job = self._job
+        try:
+            while True:
+                kind, value = job['events'].get_nowait()
+                if kind == 'progress':
+                    self._show_progress(value)
+                else:
+                    self._finish_generation(kind, value)
+                    return
+        except queue.Empty:
+            pass
+        self.after(100, self._poll_generation)
+
+    def _show_progress(self, done):
+        job = self._job
+        elapsed = time.perf_counter() - job['start']
+        rate = done / elapsed if elapsed > 0 else 0
+        text = f"{done}/{job['total']} etiquetas · {rate:.0f} etiq/s"
+        if rate > 0 and done < job['total']:
+            eta = int((job['total'] - done) / rate)
+            text += f" · restante {eta // 60}:{eta % 60:02d}"
+        self.progress.config(value=done)
+        self.progress_var.set(text)
+
+    def _finish_generation(self, kind, value):
+        out_path = self._job['path']
+        fmt = 'ZPL' if out_path.lower().endswith('.zpl') else 'PDF'
+        self._job = None
+        self.generate_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        if kind == 'done':
+            self.progress.config(value=value.labels)
+            self.progress_var.set(f"{value.labels} etiquetas en {value.pages} páginas")
+            size = f", {value.bytes_per_label:.0f} bytes por etiqueta" if value.bytes_per_label is not None else ""
+            status = (f"{fmt} generado exitosamente: {os.path.basename(out_path)} "
+                      f"(caché de códigos: {value.hit_rate:.0%} aciertos{size})")
+            if value.timer.enabled:
+                status += f" · {value.timer.summary()}"
+            self.status_var.set(status)
+            messagebox.showinfo("Éxito", f"{fmt} generado: {out_path}")
+        elif kind == 'cancelled':
+            self.progress.config(value=0)
+            self.progress_var.set("")
+            self.status_var.set("Generación cancelada")
+        else:
+            self.status_var.set(f"Error al generar {fmt}: {str(value)}")
+            messagebox.showerror("Error", f"Ocurrió un error:\n{value}")
+
+    def cancel_generation(self):
+        if self._job is not None:
+            self._job['cancel'].set()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.status_var.set("Cancelando...")
+
+    def destroy(self):
+        if self._job is not None:
+            self._job['cancel'].set()
+        super().destroy()
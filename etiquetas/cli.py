@@ -0,0 +1,324 @@
+import argparse
+import cProfile
+import sys
+import time
+from contextlib import contextmanager
+
+from .incremental import CACHE_MAX_BYTES, render_incremental
+from .parallel import render_parallel
+from .profiling import StageTimer
+from .records import has_errors, iter_records
+from .render import BARCODE_BACKENDS, DEFAULT_PRINT_PROFILE, PREFETCH_DEPTH, PRINT_PROFILES, LabelRenderer
+from .sheets import DEFAULT_SHEET, SHEETS
+from .sources import is_table_source, iter_table_records, parse_mapping, save_mapping
+from .zpl import ZPL_DPIS, ZPL_PORT, ZplRenderer
+
+
+def open_input(path):
+    # '-' lee la lista desde la entrada estándar
+    if path == '-':
+        return sys.stdin
+    return open(path, encoding='utf-8-sig')
+
+
+def print_issues(issues, limit=50):
+    for issue in issues[:limit]:
+        label = "Error" if issue.severity == 'error' else "Aviso"
+        print(f"{label}: {issue}", file=sys.stderr)
+    if len(issues) > limit:
+        print(f"... y {len(issues) - limit} problemas más", file=sys.stderr)
+
+
+@contextmanager
+def open_records(args, issues):
+    # Records de la entrada, leídos en flujo: lista de texto código;título;precio
+    # o planilla CSV/XLSX/SQLite con su mapeo de columnas
+    if is_table_source(args.input):
+        mapping = None
+        if args.map:
+            # El mapeo indicado se guarda y queda como predeterminado
+            mapping = parse_mapping(args.map)
+            save_mapping(mapping)
+        yield iter_table_records(args.input, mapping, issues, delimiter=args.delimiter,
+                                 sheet=args.xlsx_sheet, table=args.table, query=args.query)
+    else:
+        with open_input(args.input) as lines:
+            yield iter_records(lines, issues)
+
+
+def cmd_check(args):
+    issues = []
+    with open_records(args, issues) as records:
+        labels = sum(record.quantity for record in records)
+    print_issues(issues, limit=len(issues))
+    errors = sum(1 for issue in issues if issue.severity == 'error')
+    print(f"{labels} etiquetas, {errors} errores, {len(issues) - errors} avisos")
+    return 1 if errors else 0
+
+
+def read_records(records, strict, issues):
+    if not strict:
+        return records
+    # Valida la lista completa antes de dibujar la primera etiqueta
+    records = list(records)
+    if has_errors(issues):
+        print_issues(issues)
+        print("La lista tiene errores; no se generó la salida.", file=sys.stderr)
+        return None
+    return records
+
+
+def cmd_render(args):
+    # El caché de páginas arma un solo PDF en este proceso
+    if args.cache_dir and (args.workers > 1 or args.chunk_pages or args.prefetch):
+        raise ValueError("--cache-dir no se puede combinar con -j, --chunk-pages ni --prefetch")
+    if args.workers > 1 and args.prefetch:
+        raise ValueError("--prefetch no se puede combinar con -j")
+    timer = StageTimer() if args.profile_report else None
+    start = time.perf_counter()
+    renderer = LabelRenderer(logo=args.logo, icon=args.icon, barcode_backend=args.barcode, timer=timer,
+                             sheet=args.sheet, print_profile=args.print_profile, prefetch=args.prefetch)
+    issues = []
+    with open_records(args, issues) as records:
+        records = read_records(records, args.strict, issues)
+        if records is None:
+            return 1
+        if args.cache_dir:
+            result = render_incremental(renderer, records, args.output, cache_dir=args.cache_dir,
+                                        max_bytes=args.cache_max_mb * 1024 * 1024)
+        elif args.workers > 1:
+            result = render_parallel(renderer, records, args.output, workers=args.workers,
+                                     chunk_pages=args.chunk_pages)
+        else:
+            result = renderer.render(records, args.output, chunk_pages=args.chunk_pages)
+    print_issues(issues)
+    if has_errors(issues):
+        print("Las líneas con errores se omitieron.", file=sys.stderr)
+    if not result.labels:
+        print("La lista de etiquetas está vacía.", file=sys.stderr)
+        return 1
+    for path in result.outputs:
+        print(f"PDF generado: {path}")
+    if args.cache_dir:
+        print(f"{result.reused_pages} de {result.pages} páginas tomadas del caché")
+    size = f", {result.bytes_per_label:.0f} bytes por etiqueta" if result.bytes_per_label is not None else ""
+    print(f"{result.labels} etiquetas en {result.pages} páginas "
+          f"(caché de códigos: {result.hit_rate:.0%} aciertos{size})")
+    if args.profile_report:
+        result.timer.write_json(args.profile_report, labels=result.labels, pages=result.pages,
+                                seconds=round(time.perf_counter() - start, 4), workers=args.workers)
+        print(f"Tiempos por etapa: {result.timer.summary()} ({args.profile_report})")
+    return 0
+
+
+def cmd_zpl(args):
+    renderer = ZplRenderer(logo=args.logo, icon=args.icon, dpi=args.dpi)
+    issues = []
+    with open_records(args, issues) as records:
+        records = read_records(records, args.strict, issues)
+        if records is None:
+            return 1
+        result = renderer.render(records, args.output)
+    print_issues(issues)
+    if has_errors(issues):
+        print("Las líneas con errores se omitieron.", file=sys.stderr)
+    if not result.labels:
+        print("La lista de etiquetas está vacía.", file=sys.stderr)
+        return 1
+    print(f"ZPL enviado a: {args.output}" if args.output.startswith('tcp://') else f"ZPL generado: {args.output}")
+    print(f"{result.labels} etiquetas en {result.pages} formatos")
+    return 0
+
+
+def cmd_serve(args):
+    from .server import LabelServer, LabelService
+    service = LabelService(logo=args.logo, icon=args.icon, workers=args.workers, sheet=args.sheet,
+                           print_profile=args.print_profile, dpi=args.dpi, max_jobs=args.max_jobs,
+                           shard_pages=args.shard_pages)
+    try:
+        server = LabelServer((args.host, args.port), service)
+    except OSError:
+        service.close()
+        raise
+    print(f"Servicio de etiquetas en http://{args.host}:{args.port} ({service.workers} procesos)")
+    print("POST /render (PDF), POST /zpl (ZPL), GET /metrics; Ctrl+C para detener")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+def cmd_watch(args):
+    import logging
+    from .server import LabelService
+    from .watch import FolderWatcher
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    mapping = parse_mapping(args.map) if args.map else None
+    service = LabelService(logo=args.logo, icon=args.icon, workers=args.workers, sheet=args.sheet,
+                           print_profile=args.print_profile, shard_pages=args.shard_pages)
+    try:
+        watcher = FolderWatcher(service, args.inbox, args.output, archive=args.archive, mapping=mapping,
+                                window=args.window, max_wait=args.max_wait, poll=args.poll,
+                                max_queued=args.max_queued)
+        print(f"Ctrl+C para detener ({service.workers} procesos)")
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+def cmd_sheets(args):
+    for name, template in SHEETS.items():
+        print(f"{name:<20} {template.description}")
+    return 0
+
+
+def add_input_arguments(parser):
+    parser.add_argument('input', help="lista de etiquetas (código;título;precio[;cantidad]), una por línea, "
+                                      "'-' para stdin, o planilla .csv/.tsv/.xlsx/.sqlite")
+    source = parser.add_argument_group("planillas y bases de datos")
+    source.add_argument('--map', metavar='CAMPOS',
+                        help="columnas de la planilla: codigo=COL,titulo=COL,precio=COL[,cantidad=COL]; "
+                             "se guarda para las próximas importaciones")
+    source.add_argument('--delimiter', help="separador del CSV (por defecto se detecta)")
+    source.add_argument('--xlsx-sheet', metavar='HOJA', help="hoja del libro de Excel (por defecto la activa)")
+    source.add_argument('--table', help="tabla o vista de SQLite")
+    source.add_argument('--query', help="consulta SQL de SQLite en lugar de una tabla")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='etiquetas',
+        description="Generador de Etiquetas - Muebles Carrillo. Sin subcomando abre la interfaz gráfica.")
+    subparsers = parser.add_subparsers(dest='command')
+
+    render = subparsers.add_parser('render', help="genera el PDF de etiquetas sin interfaz gráfica")
+    add_input_arguments(render)
+    render.add_argument('-o', '--output', required=True, help="ruta del PDF de salida")
+    render.add_argument('--logo', help="imagen del logo de la empresa")
+    render.add_argument('--icon', help="icono de WhatsApp para los teléfonos")
+    render.add_argument('--barcode', choices=BARCODE_BACKENDS, default='vector',
+                        help="dibujo de los códigos de barras (por defecto: vector)")
+    render.add_argument('--sheet', default=DEFAULT_SHEET, metavar='PLANTILLA',
+                        help=f"plantilla de hoja: un nombre de 'etiquetas sheets' o un archivo JSON "
+                             f"(por defecto: {DEFAULT_SHEET})")
+    render.add_argument('--print-profile', choices=PRINT_PROFILES, default=DEFAULT_PRINT_PROFILE,
+                        help="resolución de logo e icono: draft 150 dpi, production 300 dpi "
+                             f"(por defecto: {DEFAULT_PRINT_PROFILE})")
+    render.add_argument('--chunk-pages', type=int, metavar='N',
+                        help="divide la salida en archivos de N páginas (salida_0001.pdf, ...)")
+    render.add_argument('-j', '--workers', type=int, default=1, metavar='N',
+                        help="procesos para generar en paralelo (por defecto: 1)")
+    render.add_argument('--prefetch', type=int, default=0, metavar='N',
+                        help="etiquetas cuyos códigos y títulos prepara otro proceso por adelantado mientras "
+                             f"se dibujan las anteriores (por defecto: 0, desactivado; pruebe {PREFETCH_DEPTH} "
+                             "y compare con benchmarks/bench_render.py --prefetch)")
+    render.add_argument('--cache-dir', metavar='DIR',
+                        help="guarda cada página en DIR y al regenerar solo dibuja las que cambiaron; "
+                             "las demás se copian del caché")
+    render.add_argument('--cache-max-mb', type=int, default=CACHE_MAX_BYTES // (1024 * 1024), metavar='MB',
+                        help="tamaño máximo de --cache-dir; se borran las páginas menos usadas "
+                             f"(por defecto: {CACHE_MAX_BYTES // (1024 * 1024)})")
+    render.add_argument('--profile-report', metavar='JSON',
+                        help="mide cada etapa del dibujo y guarda totales y percentiles en JSON")
+    render.add_argument('--cprofile', metavar='ARCHIVO',
+                        help="corre el trabajo bajo cProfile y guarda las estadísticas (pstats)")
+    render.add_argument('--strict', action='store_true',
+                        help="valida toda la lista antes de generar y no genera si hay errores")
+    render.set_defaults(func=cmd_render)
+
+    check = subparsers.add_parser('check', help="valida la lista sin generar el PDF")
+    add_input_arguments(check)
+    check.set_defaults(func=cmd_check)
+
+    zpl = subparsers.add_parser('zpl', help="genera las etiquetas en ZPL para impresoras Zebra de rollo")
+    add_input_arguments(zpl)
+    zpl.add_argument('-o', '--output', required=True,
+                     help=f"archivo .zpl o tcp://host[:puerto] para mandarlo a la impresora (puerto {ZPL_PORT})")
+    zpl.add_argument('--logo', help="imagen del logo de la empresa")
+    zpl.add_argument('--icon', help="icono de WhatsApp para los teléfonos")
+    zpl.add_argument('--dpi', type=int, choices=ZPL_DPIS, default=203, help="resolución de la impresora")
+    zpl.add_argument('--strict', action='store_true',
+                     help="valida toda la lista antes de generar y no genera si hay errores")
+    zpl.set_defaults(func=cmd_zpl)
+
+    serve = subparsers.add_parser('serve', help="atiende pedidos de etiquetas por HTTP (PDF o ZPL)")
+    serve.add_argument('--host', default='127.0.0.1', help="dirección en la que escucha (por defecto: 127.0.0.1)")
+    serve.add_argument('--port', type=int, default=8765, help="puerto (por defecto: 8765)")
+    serve.add_argument('-j', '--workers', type=int, metavar='N',
+                       help="procesos que generan las etiquetas (por defecto: uno por CPU)")
+    serve.add_argument('--max-jobs', type=int, default=32, metavar='N',
+                       help="pedidos en curso a la vez; los demás reciben 503 (por defecto: 32)")
+    serve.add_argument('--shard-pages', type=int, default=5, metavar='N',
+                       help="páginas por tarea; los pedidos se atienden por turnos de una tarea (por defecto: 5)")
+    serve.add_argument('--logo', help="imagen del logo de la empresa")
+    serve.add_argument('--icon', help="icono de WhatsApp para los teléfonos")
+    serve.add_argument('--sheet', default=DEFAULT_SHEET, metavar='PLANTILLA',
+                       help=f"plantilla de hoja por defecto; cada pedido puede elegir otra con ?sheet= "
+                            f"(por defecto: {DEFAULT_SHEET})")
+    serve.add_argument('--print-profile', choices=PRINT_PROFILES, default=DEFAULT_PRINT_PROFILE,
+                       help=f"perfil de impresión por defecto, ?profile= en el pedido (por defecto: {DEFAULT_PRINT_PROFILE})")
+    serve.add_argument('--dpi', type=int, choices=ZPL_DPIS, default=203,
+                       help="resolución ZPL por defecto, ?dpi= en el pedido")
+    serve.set_defaults(func=cmd_serve)
+
+    watch = subparsers.add_parser('watch', help="vigila una carpeta de pedidos y genera un PDF por lote")
+    watch.add_argument('inbox', help="carpeta donde llegan los pedidos (.csv/.tsv/.xlsx/.sqlite/.txt)")
+    watch.add_argument('-o', '--output', required=True, help="carpeta de los PDF generados")
+    watch.add_argument('--archive', metavar='DIR',
+                       help="carpeta de los pedidos procesados (por defecto: INBOX/procesados); "
+                            "los que tienen errores van a DIR/errores")
+    watch.add_argument('--window', type=float, default=5.0, metavar='SEG',
+                       help="junta en un lote los pedidos que llegan con menos de SEG segundos "
+                            "de diferencia (por defecto: 5)")
+    watch.add_argument('--max-wait', type=float, default=60.0, metavar='SEG',
+                       help="espera máxima de un pedido antes de cerrar su lote (por defecto: 60)")
+    watch.add_argument('--poll', type=float, default=1.0, metavar='SEG',
+                       help="cada cuánto se revisa la carpeta (por defecto: 1)")
+    watch.add_argument('--max-queued', type=int, default=4, metavar='N',
+                       help="lotes esperando a generarse; con la cola llena los pedidos nuevos "
+                            "esperan en la carpeta (por defecto: 4)")
+    watch.add_argument('-j', '--workers', type=int, metavar='N',
+                       help="procesos que generan las etiquetas (por defecto: uno por CPU)")
+    watch.add_argument('--shard-pages', type=int, default=5, metavar='N',
+                       help="páginas por tarea del grupo de procesos (por defecto: 5)")
+    watch.add_argument('--map', metavar='CAMPOS',
+                       help="columnas de las planillas: codigo=COL,titulo=COL,precio=COL[,cantidad=COL]")
+    watch.add_argument('--logo', help="imagen del logo de la empresa")
+    watch.add_argument('--icon', help="icono de WhatsApp para los teléfonos")
+    watch.add_argument('--sheet', default=DEFAULT_SHEET, metavar='PLANTILLA',
+                       help=f"plantilla de hoja (por defecto: {DEFAULT_SHEET})")
+    watch.add_argument('--print-profile', choices=PRINT_PROFILES, default=DEFAULT_PRINT_PROFILE,
+                       help=f"resolución de logo e icono (por defecto: {DEFAULT_PRINT_PROFILE})")
+    watch.set_defaults(func=cmd_watch)
+
+    sheets = subparsers.add_parser('sheets', help="lista las plantillas de hoja incluidas")
+    sheets.set_defaults(func=cmd_sheets)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from .app import LabelApp
+        app = LabelApp()
+        app.mainloop()
+        return 0
+    from barcode.errors import BarcodeError
+    try:
+        if getattr(args, 'cprofile', None):
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(args.func, args)
+            finally:
+                profiler.dump_stats(args.cprofile)
+        return args.func(args)
+    except (OSError, ValueError, ImportError, BarcodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
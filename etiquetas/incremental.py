@@ -0,0 +1,121 @@
+import hashlib
+import os
+import tempfile
+import time
+
+from .parallel import iter_shards
+from .pdfpages import link_pages, read_fragment, split_pages, write_fragment
+from .render import RenderCancelled, RenderResult
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'etiquetas', 'pages')
+# Tope del caché de páginas: al pasarlo se borran las menos usadas, y las que
+# no se usan hace más de CACHE_MAX_DAYS días se borran siempre
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_MAX_DAYS = 30
+FRAGMENT_EXT = '.pagina'
+
+
+def page_key(fingerprint, records):
+    # Hash del contenido de una página: sus etiquetas más la huella del
+    # renderer (logo, icono y parámetros de diseño)
+    h = hashlib.sha256(fingerprint.encode())
+    for record in records:
+        h.update('\x1f'.join(record[:4]).encode('utf-8'))
+        h.update(b'\x1f%d' % record.quantity)
+        h.update(b'\x1e')
+    return h.hexdigest()
+
+
+def prune_cache(cache_dir, max_bytes=CACHE_MAX_BYTES, max_days=CACHE_MAX_DAYS, keep=()):
+    # Borra las páginas más viejas (por fecha de último uso) hasta quedar bajo
+    # max_bytes, salvo las de keep (las del trabajo actual). Devuelve cuántas borró.
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(FRAGMENT_EXT):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    oldest = time.time() - max_days * 86400
+    keep = set(keep)
+    removed = 0
+    for mtime, size, path in entries:
+        if total <= max_bytes and mtime >= oldest:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def render_incremental(renderer, lines, output, cache_dir=None, progress=None, cancel=None,
+                       max_bytes=CACHE_MAX_BYTES):
+    # Cada página se guarda en cache_dir como fragmento (ver pdfpages), con su
+    # hash de contenido como nombre. Al regenerar, las páginas que cambiaron se
+    # dibujan juntas en un solo PDF que se parte en fragmentos nuevos; las demás
+    # se copian byte a byte del caché al unir el PDF final.
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    fingerprint = renderer.fingerprint()
+    result = RenderResult()
+    result.reused_pages = 0
+    keys = []
+    dirty = {}
+    reused_labels = 0
+    for page in iter_shards(lines, renderer.max_per_page):
+        if cancel is not None and cancel.is_set():
+            raise RenderCancelled()
+        key = page_key(fingerprint, page)
+        keys.append(key)
+        labels = sum(record.quantity for record in page)
+        path = os.path.join(cache_dir, key + FRAGMENT_EXT)
+        if key in dirty:
+            pass
+        elif os.path.exists(path):
+            result.reused_pages += 1
+            reused_labels += labels
+            # La fecha de modificación marca el último uso, para prune_cache
+            os.utime(path)
+        else:
+            dirty[key] = page
+        result.labels += labels
+        result.pages += 1
+    fragments = {}
+    if dirty:
+        # Todas las páginas menos la última están completas, así que una detrás
+        # de otra caen cada una en su propia hoja
+        fd, tmp = tempfile.mkstemp(suffix='.pdf', dir=cache_dir)
+        os.close(fd)
+        try:
+            page_result = renderer.render(
+                (record for page in dirty.values() for record in page), tmp, cancel=cancel,
+                progress=(lambda labels: progress(reused_labels + labels)) if progress else None)
+            with renderer.timer.stage('split'):
+                split = split_pages(tmp)
+        finally:
+            os.remove(tmp)
+        if len(split) != len(dirty):
+            raise RuntimeError(f"Se esperaban {len(dirty)} páginas nuevas y se dibujaron {len(split)}")
+        result.barcode_hits += page_result.barcode_hits
+        result.barcode_misses += page_result.barcode_misses
+        for key, fragment in zip(dirty, split):
+            fragments[key] = fragment
+            path = os.path.join(cache_dir, key + FRAGMENT_EXT)
+            write_fragment(path + '.tmp', fragment)
+            os.replace(path + '.tmp', path)
+    if keys:
+        with renderer.timer.stage('link'):
+            link_pages((fragments[key] if key in fragments else
+                        read_fragment(os.path.join(cache_dir, key + FRAGMENT_EXT)) for key in keys), output)
+        result.outputs = [output]
+    prune_cache(cache_dir, max_bytes, keep=[os.path.join(cache_dir, key + FRAGMENT_EXT) for key in keys])
+    if progress:
+        progress(result.labels)
+    result.timer = renderer.timer
+    return result
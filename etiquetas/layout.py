@@ -0,0 +1,84 @@
+from functools import lru_cache
+
+TITLE_FONT = 'Helvetica-Bold'
+TITLE_MIN_SIZE = 7
+TITLE_MAX_SIZE = 13
+# Separación entre renglones del título, en puntos
+TITLE_LEADING = 2
+
+_width_tables = {}
+
+
+def char_widths(font):
+    # Tabla de anchos por carácter (en milésimas de em), precalculada para
+    # Latin-1 la primera vez que se usa la fuente; el resto se agrega a demanda
+    table = _width_tables.get(font)
+    if table is None:
+        from reportlab.pdfbase import pdfmetrics
+        table = _width_tables[font] = {
+            chr(i): pdfmetrics.stringWidth(chr(i), font, 1000) for i in range(32, 256)
+        }
+    return table
+
+
+def text_width(text, font, size):
+    table = char_widths(font)
+    total = 0
+    for ch in text:
+        w = table.get(ch)
+        if w is None:
+            from reportlab.pdfbase import pdfmetrics
+            w = table[ch] = pdfmetrics.stringWidth(ch, font, 1000)
+        total += w
+    return total * size / 1000
+
+
+def wrap_text(text, font, size, max_width):
+    # Corte por palabras con anchos reales; las palabras que no caben solas en
+    # un renglón se parten por caracteres (como break_long_words de textwrap)
+    space = text_width(' ', font, size)
+    lines = []
+    current, current_w = '', 0
+    for word in text.split():
+        word_w = text_width(word, font, size)
+        if current and current_w + space + word_w <= max_width:
+            current += ' ' + word
+            current_w += space + word_w
+            continue
+        if current:
+            lines.append(current)
+        while word_w > max_width and len(word) > 1:
+            cut, cut_w = word[0], text_width(word[0], font, size)
+            for ch in word[1:]:
+                ch_w = text_width(ch, font, size)
+                if cut_w + ch_w > max_width:
+                    break
+                cut += ch
+                cut_w += ch_w
+            lines.append(cut)
+            word = word[len(cut):]
+            word_w = text_width(word, font, size)
+        current, current_w = word, word_w
+    if current:
+        lines.append(current)
+    return lines
+
+
+@lru_cache(maxsize=4096)
+def fit_title(title, max_width, max_height, font=TITLE_FONT,
+              min_size=TITLE_MIN_SIZE, max_size=TITLE_MAX_SIZE):
+    # Busca en forma binaria el mayor tamaño entero cuyo texto envuelto cabe en
+    # max_height; si ni el mínimo cabe se usa el mínimo. Devuelve (tamaño, renglones).
+    best = None
+    lo, hi = min_size, max_size
+    while lo <= hi:
+        size = (lo + hi) // 2
+        lines = wrap_text(title, font, size, max_width)
+        if len(lines) * (size + TITLE_LEADING) <= max_height:
+            best = (size, tuple(lines))
+            lo = size + 1
+        else:
+            hi = size - 1
+    if best is None:
+        best = (min_size, tuple(wrap_text(title, font, min_size, max_width)))
+    return best
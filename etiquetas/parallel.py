@@ -0,0 +1,104 @@
+import os
+import tempfile
+
+from .pdfpages import link_pages, split_pages
+from .profiling import NULL_TIMER, StageTimer
+from .records import Record, parse_line
+from .render import LabelRenderer, RenderResult, chunk_path
+
+# Páginas por tarea cuando la salida se une en un solo PDF
+SHARD_PAGES = 20
+
+_worker_renderer = None
+
+
+def _init_worker(logo, icon, barcode_backend, sheet, print_profile, profile):
+    # Cada proceso arma su renderer (logo e icono ya decodificados) una sola vez
+    global _worker_renderer
+    _worker_renderer = LabelRenderer(logo=logo, icon=icon, barcode_backend=barcode_backend,
+                                     timer=StageTimer() if profile else NULL_TIMER, sheet=sheet,
+                                     print_profile=print_profile)
+
+
+def _render_shard(lines, path):
+    # Con medición activa cada bloque devuelve solo sus propios tiempos
+    if _worker_renderer.timer.enabled:
+        _worker_renderer.timer = StageTimer()
+    return _worker_renderer.render(lines, path)
+
+
+def iter_shards(lines, size):
+    # Agrupa las líneas no vacías (o Records) en bloques de 'size' etiquetas
+    # (páginas completas). Las cantidades cuentan como etiquetas: un Record con
+    # más copias de las que caben en el bloque se parte entre bloques.
+    shard = []
+    free = size
+    for line in lines:
+        if not isinstance(line, Record):
+            if not line.strip():
+                continue
+            line = parse_line(line)
+        while line.quantity > free:
+            shard.append(line._replace(quantity=free))
+            yield shard
+            line = line._replace(quantity=line.quantity - free)
+            shard = []
+            free = size
+        shard.append(line)
+        free -= line.quantity
+        if free == 0:
+            yield shard
+            shard = []
+            free = size
+    if shard:
+        yield shard
+
+
+def merge_pdfs(paths, output):
+    # Une los PDF de ReportLab página por página (ver pdfpages), sin pypdf; el
+    # logo, el icono y la columna izquierda quedan una sola vez en la salida
+    link_pages((fragment for path in paths for fragment in split_pages(path)), output)
+
+
+def render_parallel(renderer, lines, output, workers=None, chunk_pages=None, shard_pages=SHARD_PAGES):
+    # Reparte la lista en bloques de páginas completas entre procesos. Con
+    # chunk_pages cada bloque es directamente un archivo de salida; si no, los
+    # bloques se escriben en temporales y se unen en orden en 'output'.
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    pages = chunk_pages or shard_pages
+    if pages < 1:
+        raise ValueError("chunk_pages debe ser al menos 1")
+    result = RenderResult()
+    result.timer = StageTimer() if renderer.timer.enabled else NULL_TIMER
+    with tempfile.TemporaryDirectory() as tmpdir, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(renderer.logo, renderer.icon, renderer.barcode_backend, renderer.sheet,
+                      renderer.print_profile.name, renderer.timer.enabled)) as pool:
+        shard_paths = []
+        pending = []
+        for index, shard in enumerate(iter_shards(lines, pages * renderer.max_per_page), 1):
+            path = chunk_path(output if chunk_pages else os.path.join(tmpdir, 'shard.pdf'), index)
+            shard_paths.append(path)
+            pending.append(pool.submit(_render_shard, shard, path))
+            # Limita los bloques en vuelo para que la memoria no dependa del largo de la lista
+            while len(pending) >= 2 * workers:
+                _collect(pending.pop(0).result(), result)
+        for future in pending:
+            _collect(future.result(), result)
+        if chunk_pages:
+            result.outputs = shard_paths
+        elif shard_paths:
+            with result.timer.stage('merge'):
+                # Cada bloque trae su copia del logo y el icono: se deja una sola
+                merge_pdfs(shard_paths, output)
+            result.outputs = [output]
+    return result
+
+
+def _collect(shard, result):
+    result.labels += shard.labels
+    result.pages += shard.pages
+    result.barcode_hits += shard.barcode_hits
+    result.barcode_misses += shard.barcode_misses
+    result.timer.merge(shard.timer)
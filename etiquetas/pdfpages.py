@@ -0,0 +1,168 @@
+import hashlib
+import os
+import re
+
+# Partir los PDF que genera ReportLab en páginas sueltas y volver a unirlas sin
+# pypdf. Cada página se guarda como un "fragmento": sus objetos (la página, su
+# contenido y todo lo que usa: formularios, imágenes, fuentes) con las
+# referencias renumeradas dentro del fragmento. Al unir, los flujos se copian
+# tal cual y los objetos repetidos (logo, icono, columna izquierda) se escriben
+# una sola vez, reconocidos por un hash de su contenido. Solo entiende PDF
+# escritos por ReportLab (tabla xref clásica, sin flujos de objetos).
+
+REF_RE = re.compile(rb'(?<![\d.])(\d+) 0 R(?![A-Za-z])')
+PARENT_RE = re.compile(rb'/Parent \d+ 0 R')
+STREAM_RE = re.compile(rb'>>\s*stream\r?\n')
+FRAGMENT_HEADER = b'%etiquetas-pagina 1\n'
+# Hash de los objetos que no se comparten entre páginas (las páginas mismas)
+PAGE = b'-'
+PDF_HEADER = b'%PDF-1.3\n%\x93\x8c\x8b\x9e\n'
+
+
+def _split_head(body):
+    # Las referencias solo pueden estar en el diccionario, no en el flujo
+    m = STREAM_RE.search(body)
+    return (body[:m.start() + 2], body[m.start() + 2:]) if m else (body, b'')
+
+
+def _read_objects(data):
+    start = data.rindex(b'startxref')
+    xref = int(data[start + 9:].split(None, 1)[0])
+    m = re.compile(rb'xref\s+0\s+(\d+)\s+').match(data, xref)
+    if m is None:
+        raise ValueError("El PDF no tiene una tabla xref clásica")
+    entries = re.compile(rb'(\d{10}) \d{5} ([nf])').findall(data, m.end())[:int(m.group(1))]
+    offsets = sorted((int(offset), number) for number, (offset, kind) in enumerate(entries) if kind == b'n')
+    objects = {}
+    for i, (offset, number) in enumerate(offsets):
+        end = offsets[i + 1][0] if i + 1 < len(offsets) else xref
+        header = re.compile(rb'\d+ 0 obj\s*').match(data, offset)
+        objects[number] = data[header.end():data.rindex(b'endobj', offset, end)]
+    trailer = data[data.index(b'trailer', xref):start]
+    return objects, int(re.search(rb'/Root (\d+) 0 R', trailer).group(1))
+
+
+def _page_numbers(objects, number):
+    # Recorre el árbol de páginas en orden
+    body = objects[number]
+    if re.search(rb'/Type /Pages\b', body):
+        for kid in REF_RE.findall(body[body.index(b'/Kids'):]):
+            yield from _page_numbers(objects, int(kid))
+    else:
+        yield number
+
+
+def split_pages(path):
+    # Devuelve un fragmento por página: lista de (hash, cabecera, flujo), con
+    # los objetos que usa la página antes que ella y la página al final. En las
+    # referencias, 0 es el árbol de páginas y k el objeto k-ésimo del fragmento.
+    with open(path, 'rb') as f:
+        data = f.read()
+    objects, root = _read_objects(data)
+    pages = re.search(rb'/Pages (\d+) 0 R', objects[root]).group(1)
+    heads = {}
+    hashes = {}
+
+    def split(number):
+        if number not in heads:
+            heads[number] = _split_head(objects[number])
+        return heads[number]
+
+    def object_hash(number):
+        # Hash del objeto con cada referencia cambiada por el hash de su destino
+        if number not in hashes:
+            head, stream = split(number)
+            canonical = REF_RE.sub(lambda m: b'<' + object_hash(int(m.group(1))) + b'>', head)
+            hashes[number] = hashlib.sha1(canonical + stream).hexdigest().encode()
+        return hashes[number]
+
+    fragments = []
+    for page in _page_numbers(objects, int(pages)):
+        head, stream = split(page)
+        heads[page] = (PARENT_RE.sub(b'/Parent 0 0 R', head), stream)
+        local = {0: 0}
+        order = []
+
+        def visit(number):
+            local[number] = None
+            for ref in REF_RE.findall(heads[number][0] if number == page else split(number)[0]):
+                if int(ref) not in local:
+                    visit(int(ref))
+            order.append(number)
+            local[number] = len(order)
+
+        visit(page)
+        fragment = []
+        for number in order:
+            head, stream = heads[number]
+            head = REF_RE.sub(lambda m: b'%d 0 R' % local[int(m.group(1))], head)
+            fragment.append((PAGE if number == page else object_hash(number), head, stream))
+        fragments.append(fragment)
+    return fragments
+
+
+def write_fragment(path, fragment):
+    with open(path, 'wb') as f:
+        f.write(FRAGMENT_HEADER)
+        for object_hash, head, stream in fragment:
+            f.write(b'%s %d %d\n' % (object_hash, len(head), len(stream)))
+            f.write(head)
+            f.write(stream)
+
+
+def read_fragment(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(FRAGMENT_HEADER):
+        raise ValueError(f"{path} no es un fragmento de página")
+    fragment = []
+    pos = len(FRAGMENT_HEADER)
+    while pos < len(data):
+        end = data.index(b'\n', pos)
+        object_hash, head_len, stream_len = data[pos:end].split()
+        pos = end + 1
+        head_end = pos + int(head_len)
+        fragment.append((object_hash, data[pos:head_end], data[head_end:head_end + int(stream_len)]))
+        pos = head_end + int(stream_len)
+    return fragment
+
+
+def link_pages(fragments, output):
+    # Une los fragmentos en orden en un PDF. Objeto 1: catálogo, 2: páginas.
+    offsets = {}
+    shared = {}
+    kids = []
+    next_number = 3
+    with open(output, 'wb') as f:
+        f.write(PDF_HEADER)
+        pos = len(PDF_HEADER)
+
+        def write(number, head, stream=b''):
+            nonlocal pos
+            offsets[number] = pos
+            chunk = b'%d 0 obj\n' % number
+            f.write(chunk)
+            f.write(head)
+            f.write(stream)
+            f.write(b'endobj\n')
+            pos += len(chunk) + len(head) + len(stream) + 7
+
+        for fragment in fragments:
+            numbers = [2]
+            for object_hash, head, stream in fragment:
+                number = shared.get(object_hash) if object_hash != PAGE else None
+                if number is None:
+                    number = next_number
+                    next_number += 1
+                    if object_hash != PAGE:
+                        shared[object_hash] = number
+                    write(number, REF_RE.sub(lambda m: b'%d 0 R' % numbers[int(m.group(1))], head), stream)
+                numbers.append(number)
+            kids.append(numbers[-1])
+        write(2, b'<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>\n'
+              % (len(kids), b' '.join(b'%d 0 R' % kid for kid in kids)))
+        write(1, b'<<\n/PageMode /UseNone /Pages 2 0 R /Type /Catalog\n>>\n')
+        f.write(b'xref\n0 %d\n0000000000 65535 f \n' % next_number)
+        f.write(b''.join(b'%010d 00000 n \n' % offsets[number] for number in range(1, next_number)))
+        f.write(b'trailer\n<<\n/Root 1 0 R /Size %d\n>>\nstartxref\n%d\n%%%%EOF\n' % (next_number, pos))
+    return len(kids)
@@ -0,0 +1,274 @@
+import io
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+from .incremental import page_key
+
+# Resolución de la página grande y alto de las miniaturas, en píxeles
+PREVIEW_DPI = 60
+THUMB_HEIGHT = 110
+THUMBNAILS = 5
+# Páginas que se preparan por adelantado en la dirección en que se avanza
+READ_AHEAD = 3
+PAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def page_keys(renderer, pages):
+    fingerprint = renderer.fingerprint()
+    return [page_key(fingerprint, records) for records in pages]
+
+
+class PageCache:
+    # Páginas ya dibujadas, guardadas como PNG por clave de contenido (page_key
+    # más el tipo de imagen). Una hoja en PNG ocupa unos 40 KB contra 1.4 MB
+    # sin comprimir; al pasar de max_bytes se descartan las menos usadas.
+    def __init__(self, max_bytes=PAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        from PIL import Image
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                return None
+            self._entries.move_to_end(key)
+        return Image.open(io.BytesIO(data))
+
+    def put(self, key, img):
+        buf = io.BytesIO()
+        img.save(buf, 'PNG', compress_level=1)
+        data = buf.getvalue()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._entries[key] = data
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+
+class PageRenderer(threading.Thread):
+    # Dibuja páginas en segundo plano en el orden en que las pide la vista.
+    # Cada pedido reemplaza a los anteriores que aún no empezaron, así al
+    # avanzar rápido no se dibujan las páginas que ya se dejaron atrás.
+    def __init__(self, cache, done):
+        super().__init__(daemon=True)
+        self.cache = cache
+        self.done = done
+        self._pending = []
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    def request(self, jobs):
+        # jobs: (clave, renderer, records) por página, la más urgente primero
+        with self._cond:
+            self._pending = list(jobs)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                key, renderer, records = self._pending.pop(0)
+            if (key, 'page') in self.cache and (key, 'thumb') in self.cache:
+                continue
+            try:
+                img = renderer.render_page_image(records, PREVIEW_DPI)
+            except Exception as e:
+                self.done.put((key, e))
+                continue
+            thumb = img.copy()
+            thumb.thumbnail((THUMB_HEIGHT, THUMB_HEIGHT))
+            self.cache.put((key, 'page'), img)
+            self.cache.put((key, 'thumb'), thumb)
+            self.done.put((key, None))
+
+
+class SheetPreview(tk.Toplevel):
+    # Hojas completas tal como se imprimirán, con navegación por páginas y una
+    # tira de miniaturas. Las imágenes salen de un PageCache compartido, así
+    # volver a una página (o reabrir la ventana) no la dibuja de nuevo.
+    def __init__(self, master, cache):
+        super().__init__(master)
+        self.title("Vista de Hojas")
+        self.configure(bg="#f5f5f5")
+        self.cache = cache
+        self.renderer = None
+        self.pages = []
+        self.keys = []
+        self.page = 0
+        self.strip_top = 0
+        self._direction = 1
+        self._errors = {}
+        self._shown = {}
+        self._done = queue.Queue()
+        self._worker = PageRenderer(cache, self._done)
+        self._worker.start()
+
+        toolbar = tk.Frame(self, bg="#f5f5f5", pady=5)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
+        tk.Button(toolbar, text="◀ Anterior", command=lambda: self.show(self.page - 1),
+                  bg="#e0e0e0", font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+        tk.Button(toolbar, text="Siguiente ▶", command=lambda: self.show(self.page + 1),
+                  bg="#e0e0e0", font=("Arial", 10)).pack(side=tk.LEFT)
+        self.page_var = tk.StringVar()
+        tk.Label(toolbar, textvariable=self.page_var, font=("Arial", 10, "bold"),
+                 bg="#f5f5f5").pack(side=tk.LEFT, padx=10)
+        self.cache_var = tk.StringVar()
+        tk.Label(toolbar, textvariable=self.cache_var, font=("Arial", 9), bg="#f5f5f5",
+                 fg="#555555").pack(side=tk.RIGHT, padx=5)
+
+        strip = tk.Frame(self, bg="#e8e8e8", padx=4, pady=4)
+        strip.pack(side=tk.LEFT, fill=tk.Y)
+        self.thumbs = []
+        for slot in range(THUMBNAILS):
+            # Marco de tamaño fijo: sin imagen, el ancho de un Label se mide en caracteres
+            cell = tk.Frame(strip, width=THUMB_HEIGHT + 10, height=THUMB_HEIGHT + 26, bg="#e8e8e8")
+            cell.pack_propagate(False)
+            cell.pack(pady=2)
+            label = tk.Label(cell, bg="#e8e8e8", compound=tk.TOP, font=("Arial", 8), bd=2, relief=tk.FLAT)
+            label.pack(expand=True, fill=tk.BOTH)
+            label.bind('<Button-1>', lambda e, slot=slot: self.show(self.strip_top + slot))
+            self.thumbs.append(label)
+
+        self.image_label = tk.Label(self, bg="#9e9e9e", font=("Arial", 11), padx=10, pady=10)
+        self.image_label.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        for widget in [self, strip] + self.thumbs:
+            widget.bind('<MouseWheel>', lambda e: self._scroll_strip(-1 if e.delta > 0 else 1))
+            widget.bind('<Button-4>', lambda e: self._scroll_strip(-1))
+            widget.bind('<Button-5>', lambda e: self._scroll_strip(1))
+        for keys, delta in ((('<Left>', '<Prior>', '<Up>'), -1), (('<Right>', '<Next>', '<Down>'), 1)):
+            for key in keys:
+                self.bind(key, lambda e, delta=delta: self.show(self.page + delta))
+        self.bind('<Home>', lambda e: self.show(0))
+        self.bind('<End>', lambda e: self.show(len(self.pages) - 1))
+        self._poll_after = self.after(50, self._poll)
+
+    def set_pages(self, renderer, pages, keys=None):
+        # pages: lista de bloques de iter_shards, uno por hoja; keys (de
+        # page_keys) se puede calcular antes, fuera del hilo de Tk
+        self.renderer = renderer
+        self.pages = pages
+        self.keys = keys if keys is not None else page_keys(renderer, pages)
+        self._errors = {}
+        self.show(min(self.page, max(0, len(pages) - 1)))
+
+    def show(self, index):
+        if not self.pages:
+            self.page = 0
+            self._refresh()
+            return
+        index = max(0, min(index, len(self.pages) - 1))
+        if index != self.page:
+            self._direction = 1 if index > self.page else -1
+        self.page = index
+        # La tira de miniaturas sigue a la página actual
+        if not self.strip_top <= index < self.strip_top + THUMBNAILS:
+            self.strip_top = index - THUMBNAILS // 2
+        self.strip_top = max(0, min(self.strip_top, len(self.pages) - THUMBNAILS))
+        self._request()
+        self._refresh()
+
+    def _scroll_strip(self, delta):
+        self.strip_top = max(0, min(self.strip_top + delta, len(self.pages) - THUMBNAILS))
+        self._request()
+        self._refresh()
+        return 'break'
+
+    def _request(self):
+        # Primero la página que se mira, después las siguientes en la
+        # dirección en que se avanza y por último las miniaturas visibles
+        order = [self.page + self._direction * step for step in range(READ_AHEAD + 1)]
+        order += range(self.strip_top, self.strip_top + THUMBNAILS)
+        seen = set()
+        jobs = []
+        for index in order:
+            if 0 <= index < len(self.pages) and index not in seen:
+                seen.add(index)
+                jobs.append((self.keys[index], self.renderer, self.pages[index]))
+        self._worker.request(jobs)
+
+    def _refresh(self):
+        if not self.pages:
+            self.page_var.set("Sin etiquetas")
+            self._set_image(self.image_label, 'main', None, '', "La lista de etiquetas está vacía.")
+            for slot, label in enumerate(self.thumbs):
+                self._set_image(label, slot, None, '', '')
+            return
+        records = self.pages[self.page]
+        labels = sum(record.quantity for record in records)
+        rows = f"filas {records[0].line_no}–{records[-1].line_no}" if records[0].line_no else ''
+        self.page_var.set(f"Página {self.page + 1} de {len(self.pages)} · {labels} etiquetas"
+                          + (f" · {rows}" if rows else ''))
+        self.cache_var.set(f"caché: {len(self.cache)} imágenes, {self.cache.bytes / 1e6:.1f} MB")
+
+        key = self.keys[self.page]
+        error = self._errors.get(key)
+        self._set_image(self.image_label, 'main', (key, 'page'), '',
+                        f"Error al dibujar la página {self.page + 1}:\n{error}" if error
+                        else f"Dibujando la página {self.page + 1}...")
+        for slot, label in enumerate(self.thumbs):
+            index = self.strip_top + slot
+            if index < len(self.pages):
+                self._set_image(label, slot, (self.keys[index], 'thumb'), str(index + 1), f"{index + 1}\n...")
+                label.config(relief=tk.SOLID if index == self.page else tk.FLAT)
+            else:
+                self._set_image(label, slot, None, '', '')
+                label.config(relief=tk.FLAT)
+
+    def _set_image(self, label, slot, key, caption, placeholder):
+        # Solo se decodifica y se crea el PhotoImage si cambió lo que muestra el lugar
+        from PIL import ImageTk
+        shown = key if key is not None and key in self.cache else (None, placeholder)
+        if self._shown.get(slot) == shown:
+            return
+        img = self.cache.get(key) if shown == key else None
+        self._shown[slot] = shown if img is not None else (None, placeholder)
+        if img is None:
+            label.config(image='', text=placeholder)
+            label.photo = None
+        else:
+            photo = ImageTk.PhotoImage(img)
+            label.config(image=photo, text=caption)
+            label.photo = photo
+
+    def _poll(self):
+        changed = False
+        try:
+            while True:
+                key, error = self._done.get_nowait()
+                if error is not None:
+                    self._errors[key] = error
+                changed = True
+        except queue.Empty:
+            pass
+        if changed:
+            self._refresh()
+        self._poll_after = self.after(50, self._poll)
+
+    def destroy(self):
+        self.after_cancel(self._poll_after)
+        self._worker.stop()
+        super().destroy()
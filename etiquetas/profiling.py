@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from array import array
+from contextlib import contextmanager, nullcontext
+
+# Con ETIQUETAS_PROFILE=1 en el entorno, los renderers miden cada etapa
+PROFILE_ENV = 'ETIQUETAS_PROFILE'
+
+
+class StageTimer:
+    # Acumula la duración de cada etapa del dibujo (en segundos) para poder
+    # ver totales, conteos y percentiles al terminar un trabajo.
+    enabled = True
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = array('d')
+        samples.append(seconds)
+
+    def merge(self, other):
+        for name, samples in other.samples.items():
+            self.samples.setdefault(name, array('d')).extend(samples)
+
+    def report(self):
+        total = sum(sum(s) for s in self.samples.values())
+        stages = {}
+        for name, samples in sorted(self.samples.items(), key=lambda kv: -sum(kv[1])):
+            ordered = sorted(samples)
+            stage_total = sum(ordered)
+            stages[name] = {
+                'count': len(ordered),
+                'total_ms': round(stage_total * 1000, 3),
+                'share': round(stage_total / total, 4) if total else 0.0,
+                'mean_ms': round(stage_total * 1000 / len(ordered), 4),
+                'p50_ms': round(percentile(ordered, 50) * 1000, 4),
+                'p90_ms': round(percentile(ordered, 90) * 1000, 4),
+                'p99_ms': round(percentile(ordered, 99) * 1000, 4),
+                'max_ms': round(ordered[-1] * 1000, 4),
+            }
+        return stages
+
+    def summary(self, top=4):
+        # Texto corto para la barra de estado: las etapas que más tiempo llevaron
+        stages = self.report()
+        return ' · '.join(f"{name} {s['share']:.0%}" for name, s in list(stages.items())[:top])
+
+    def write_json(self, path, **extra):
+        data = dict(extra, stages=self.report())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+class NullTimer:
+    # Sustituto sin costo cuando la medición está apagada
+    enabled = False
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def add(self, name, seconds):
+        pass
+
+    def merge(self, other):
+        pass
+
+    def report(self):
+        return {}
+
+    def summary(self, top=4):
+        return ''
+
+
+NULL_TIMER = NullTimer()
+
+
+def percentile(ordered, pct):
+    # Percentil por interpolación lineal sobre una secuencia ya ordenada
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def profiling_enabled():
+    return os.environ.get(PROFILE_ENV, '') not in ('', '0')
+
+
+def timer_from_env():
+    return StageTimer() if profiling_enabled() else NULL_TIMER
@@ -0,0 +1,174 @@
+from functools import lru_cache, wraps
+
+from PIL import Image, ImageDraw, ImageFont
+from reportlab.pdfbase import pdfmetrics
+
+# Fuentes TrueType con las que se intenta imitar Helvetica al rasterizar; si
+# ninguna está instalada se usa la fuente escalable que trae Pillow
+FONT_FILES = {
+    'Helvetica': ('Helvetica.ttf', 'arial.ttf', 'Arial.ttf', 'LiberationSans-Regular.ttf',
+                  'DejaVuSans.ttf'),
+    'Helvetica-Bold': ('Helvetica-Bold.ttf', 'arialbd.ttf', 'Arial Bold.ttf',
+                       'LiberationSans-Bold.ttf', 'DejaVuSans-Bold.ttf'),
+}
+
+
+@lru_cache(maxsize=64)
+def load_font(name, size_px):
+    for filename in FONT_FILES.get(name, ()):
+        try:
+            return ImageFont.truetype(filename, size_px)
+        except OSError:
+            continue
+    return ImageFont.load_default(size_px)
+
+
+def _recordable(method):
+    # Dentro de beginForm/endForm las operaciones se guardan para repetirlas en doForm
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._recording is not None:
+            self._recording.append((method, args, kwargs))
+            return None
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _Path:
+    def __init__(self):
+        self.rects = []
+
+    def rect(self, x, y, width, height):
+        self.rects.append((x, y, width, height))
+
+
+class RasterCanvas:
+    # Imita el subconjunto de reportlab.pdfgen.canvas.Canvas que usa
+    # LabelRenderer, pero dibuja directo sobre una imagen PIL en memoria.
+    # Las coordenadas son puntos PDF con origen abajo a la izquierda.
+    def __init__(self, width, height, dpi=144, margin=2):
+        self.px_per_pt = dpi / 72
+        self.image = Image.new('RGB', (round((width + 2*margin) * self.px_per_pt),
+                                       round((height + 2*margin) * self.px_per_pt)), 'white')
+        self._draw = ImageDraw.Draw(self.image)
+        self._state = {'tx': margin, 'ty': margin, 'sx': 1.0, 'sy': 1.0,
+                       'font': ('Helvetica', 12), 'fill': (0, 0, 0)}
+        self._stack = []
+        self._forms = {}
+        self._recording = None
+        self._recordings = []
+
+    def _px(self, x, y):
+        s = self._state
+        return ((s['tx'] + x*s['sx']) * self.px_per_pt,
+                self.image.height - (s['ty'] + y*s['sy']) * self.px_per_pt)
+
+    def _box(self, x, y, width, height):
+        x0, y0 = self._px(x, y)
+        x1, y1 = self._px(x + width, y + height)
+        return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+    def stringWidth(self, text, font, size):
+        return pdfmetrics.stringWidth(text, font, size)
+
+    def beginPath(self):
+        return _Path()
+
+    def beginForm(self, name, *bbox):
+        # Los formularios pueden anidarse (una etiqueta estampada define dentro
+        # el de su código de barras): al cerrar se sigue grabando el de afuera
+        self._recordings.append(self._recording)
+        self._recording = self._forms[name] = []
+
+    def endForm(self):
+        self._recording = self._recordings.pop()
+
+    @_recordable
+    def doForm(self, name):
+        self.saveState()
+        for method, args, kwargs in self._forms[name]:
+            method(self, *args, **kwargs)
+        self.restoreState()
+
+    @_recordable
+    def saveState(self):
+        self._stack.append(dict(self._state))
+
+    @_recordable
+    def restoreState(self):
+        self._state = self._stack.pop()
+
+    @_recordable
+    def translate(self, dx, dy):
+        s = self._state
+        s['tx'] += dx * s['sx']
+        s['ty'] += dy * s['sy']
+
+    @_recordable
+    def scale(self, x, y):
+        self._state['sx'] *= x
+        self._state['sy'] *= y
+
+    @_recordable
+    def setFont(self, name, size):
+        self._state['font'] = (name, size)
+
+    @_recordable
+    def setFillColorRGB(self, r, g, b):
+        self._state['fill'] = (round(r*255), round(g*255), round(b*255))
+
+    @_recordable
+    def rect(self, x, y, width, height, stroke=1, fill=0):
+        box = self._box(x, y, width, height)
+        self._draw.rectangle(box, fill=self._state['fill'] if fill else None,
+                             outline=(0, 0, 0) if stroke else None,
+                             width=max(1, round(self.px_per_pt * self._state['sx'])))
+
+    @_recordable
+    def line(self, x1, y1, x2, y2):
+        self._draw.line([self._px(x1, y1), self._px(x2, y2)], fill=(0, 0, 0),
+                        width=max(1, round(self.px_per_pt * self._state['sx'])))
+
+    @_recordable
+    def drawPath(self, path, stroke=1, fill=0):
+        for rect in path.rects:
+            x0, y0, x1, y1 = self._box(*rect)
+            # Cada barra ocupa los píxeles que cubre en más de la mitad (al menos
+            # uno, para que a baja resolución las barras finas no desaparezcan)
+            left, top = round(x0), round(y0)
+            self._draw.rectangle((left, top, max(left, round(x1) - 1), max(top, round(y1) - 1)),
+                                 fill=self._state['fill'] if fill else None,
+                                 outline=(0, 0, 0) if stroke else None)
+
+    @_recordable
+    def drawString(self, x, y, text):
+        name, size = self._state['font']
+        size_px = max(1, round(size * self.px_per_pt * self._state['sy']))
+        font = load_font(name, size_px)
+        # Si la fuente sustituta es más ancha que Helvetica se achica para que el
+        # texto ocupe el mismo ancho que en el PDF
+        target = self.stringWidth(text, name, size) * self.px_per_pt * self._state['sx']
+        actual = font.getlength(text)
+        if actual > target > 0:
+            font = load_font(name, max(1, int(size_px * target / actual)))
+        self._draw.text(self._px(x, y), text, font=font, fill=self._state['fill'], anchor='ls')
+
+    @_recordable
+    def drawCentredString(self, x, y, text):
+        name, size = self._state['font']
+        self.drawString(x - self.stringWidth(text, name, size) / 2, y, text)
+
+    @_recordable
+    def drawImage(self, image, x, y, width, height, preserveAspectRatio=False, mask=None):
+        if preserveAspectRatio:
+            ratio = min(width / image.width, height / image.height)
+            x += (width - image.width*ratio) / 2
+            y += (height - image.height*ratio) / 2
+            width, height = image.width*ratio, image.height*ratio
+        x0, y0, x1, y1 = self._box(x, y, width, height)
+        size = (max(1, round(x1 - x0)), max(1, round(y1 - y0)))
+        img = image.resize(size, Image.LANCZOS)
+        if img.mode == 'RGBA':
+            self.image.paste(img, (round(x0), round(y0)), img)
+        else:
+            self.image.paste(img.convert('RGB'), (round(x0), round(y0)))
@@ -0,0 +1,134 @@
+import re
+from typing import NamedTuple
+
+# Largo máximo que se imprime en Code128; lo que sobra se recorta
+CODE128_MAX = 15
+PRICE_RE = re.compile(r'^(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{1,2})?$')
+
+
+class Record(NamedTuple):
+    code: str
+    title: str
+    price: str
+    symbology: str
+    line_no: int = 0
+    quantity: int = 1
+
+
+class ParseIssue(NamedTuple):
+    line_no: int
+    severity: str
+    message: str
+
+    def __str__(self):
+        return f"Línea {self.line_no}: {self.message}"
+
+
+def barcode_symbology(code):
+    if code.isdigit() and len(code) == 13:
+        return 'ean13', code
+    return 'code128', code[:CODE128_MAX]
+
+
+def ean13_checksum(digits):
+    evensum = sum(int(x) for x in digits[-2::-2])
+    oddsum = sum(int(x) for x in digits[-1::-2])
+    return (10 - ((evensum + oddsum * 3) % 10)) % 10
+
+
+def split_line(line):
+    parts = line.split(';')
+    code = parts[0].strip()
+    title = parts[1].strip() if len(parts) > 1 else ""
+    price = parts[2].strip() if len(parts) > 2 else ""
+    quantity = parts[3].strip() if len(parts) > 3 else ""
+    return code, title, price, quantity
+
+
+def parse_quantity(text):
+    # Cantidad de copias de la etiqueta; vacía es 1, inválida devuelve None
+    if not text:
+        return 1
+    if not text.isdigit() or int(text) < 1:
+        return None
+    return int(text)
+
+
+def parse_line(line, line_no=0):
+    # Una cantidad inválida queda en 0 para que check_record la rechace
+    code, title, price, quantity = split_line(line)
+    symbology, code = barcode_symbology(code)
+    quantity = parse_quantity(quantity)
+    return Record(code, title, price, symbology, line_no, 0 if quantity is None else quantity)
+
+
+def check_fields(code, price, line_no, quantity=''):
+    issues = []
+    if not code:
+        issues.append(ParseIssue(line_no, 'error', "falta el código"))
+    elif code.isdigit() and len(code) == 13:
+        expected = ean13_checksum(code[:12])
+        if int(code[12]) != expected:
+            issues.append(ParseIssue(line_no, 'error',
+                                     f"EAN-13 {code} con dígito verificador inválido (debería ser {expected})"))
+    else:
+        if not code.isascii():
+            issues.append(ParseIssue(line_no, 'error', f"el código {code} tiene caracteres no válidos para Code128"))
+        if len(code) > CODE128_MAX:
+            issues.append(ParseIssue(line_no, 'warning',
+                                     f"el código {code} tiene más de {CODE128_MAX} caracteres y se recortará"))
+    if price and not PRICE_RE.match(price):
+        issues.append(ParseIssue(line_no, 'error', f"precio no numérico: {price}"))
+    if parse_quantity(quantity) is None:
+        issues.append(ParseIssue(line_no, 'error', f"cantidad inválida: {quantity}"))
+    return issues
+
+
+def iter_records(lines, issues=None):
+    # Recorre las líneas una vez: salta las vacías, devuelve Records listos para
+    # dibujar y, si se pasa una lista en issues, agrega ahí los problemas
+    # encontrados con su número de línea (contando también las vacías)
+    rows = ((line_no, *split_line(line)) for line_no, line in enumerate(lines, 1) if line.strip())
+    return iter_field_records(rows, issues)
+
+
+def iter_field_records(rows, issues=None):
+    # Igual que iter_records pero con los campos ya separados:
+    # (número de línea, código, título, precio, cantidad), p. ej. de una planilla.
+    # Las filas con errores se informan en issues pero no se devuelven: sin
+    # código python-barcode falla, y en un EAN-13 mal escrito recalcula el
+    # dígito verificador y las barras no coinciden con el número impreso
+    seen = {}
+    for line_no, code, title, price, quantity in rows:
+        row_issues = check_fields(code, price, line_no, quantity)
+        if issues is not None:
+            issues.extend(row_issues)
+            first = seen.setdefault(code, line_no)
+            if first != line_no:
+                issues.append(ParseIssue(line_no, 'warning', f"código {code} repetido (ya está en la línea {first})"))
+        if has_errors(row_issues):
+            continue
+        symbology, printed = barcode_symbology(code)
+        yield Record(printed, title, price, symbology, line_no, parse_quantity(quantity) or 1)
+
+
+def parse_records(lines):
+    issues = []
+    records = list(iter_records(lines, issues))
+    return records, issues
+
+
+def has_errors(issues):
+    return any(issue.severity == 'error' for issue in issues)
+
+
+def check_record(record):
+    # Para lo que llega a los renderers sin pasar por iter_records (líneas de
+    # texto o Records armados a mano): un error se lanza como ValueError
+    issues = check_fields(record.code, record.price, record.line_no)
+    if record.quantity < 1:
+        issues.append(ParseIssue(record.line_no, 'error', "cantidad inválida (debe ser un entero mayor que 0)"))
+    for issue in issues:
+        if issue.severity == 'error':
+            raise ValueError(str(issue) if record.line_no else issue.message)
+    return record
@@ -0,0 +1,662 @@
+import hashlib
+import io
+import os
+from reportlab.lib.units import mm
+from itertools import groupby, islice
+from collections import OrderedDict, deque
+from functools import lru_cache, partial
+from typing import NamedTuple
+
+from .layout import TITLE_FONT, TITLE_LEADING, TITLE_MIN_SIZE, char_widths, fit_title
+from .profiling import NULL_TIMER, timer_from_env
+from .records import Record, barcode_symbology, check_record, parse_line
+from .sheets import DEFAULT_SHEET, load_sheet
+
+# El canvas de ReportLab, python-barcode y PIL se importan al usarlos por
+# primera vez: así la ventana aparece sin esperarlos (ver preload)
+
+LABEL_W, LABEL_H = 95*mm, 45*mm
+ICON_SIZE = 3.5*mm
+# El logo deja al menos 24 mm de alto libres para el texto de la columna izquierda
+LOGO_SIZE = min(30*mm, max(10*mm, LABEL_H - 24*mm))
+PRINT_DPI = 300
+# Cambiarlo cuando cambie el dibujo de la etiqueta: invalida las páginas en caché
+LAYOUT_VERSION = 1
+
+BARCODE_BACKENDS = ('vector', 'png')
+BARCODE_OPTIONS = {
+    'module_width': 0.4,
+    'module_height': 12.0,
+    'quiet_zone': 1,
+    'write_text': False
+}
+# Margen vertical (mm) que ImageWriter agrega arriba y abajo de las barras
+BARCODE_MARGIN = 1.0
+# Códigos que BarcodeCache mantiene embebidos en cada archivo
+BARCODE_CACHE_SIZE = 1024
+# Etiquetas que se preparan por adelantado (códigos y títulos) en un proceso
+# aparte mientras se dibujan las anteriores, y cuántas se le mandan por vez
+PREFETCH_DEPTH = 256
+PREFETCH_CHUNK = 64
+
+def preload():
+    # Importa lo pesado y arma las tablas de anchos de las fuentes; la interfaz
+    # lo llama en segundo plano una vez dibujada la ventana
+    import reportlab.pdfgen.canvas
+    import reportlab.lib.utils
+    import barcode.writer
+    import PIL.Image
+    for font in ('Helvetica', 'Helvetica-Bold', TITLE_FONT):
+        char_widths(font)
+
+def barcode_generator(code, writer=None):
+    from barcode import EAN13, Code128
+    symbology, code = barcode_symbology(code)
+    if symbology == 'ean13':
+        return EAN13(code, writer=writer), code
+    return Code128(code, writer=writer), code
+
+def draw_barcode_vector(c, modules, x, y, width, height, options=BARCODE_OPTIONS):
+    # Reproduce la geometría de ImageWriter (zona de silencio y márgenes) escalada a la caja
+    total_w = 2*options['quiet_zone'] + len(modules)*options['module_width']
+    total_h = 2*BARCODE_MARGIN + options['module_height']
+    sx = width / total_w
+    sy = height / total_h
+    module_w = options['module_width'] * sx
+    bar_y = y + BARCODE_MARGIN * sy
+    bar_h = options['module_height'] * sy
+    path = c.beginPath()
+    pos = 0
+    for mod, run in groupby(modules):
+        n = len(list(run))
+        if mod != '0':
+            path.rect(x + options['quiet_zone']*sx + pos*module_w, bar_y, n*module_w, bar_h)
+        pos += n
+    c.drawPath(path, stroke=0, fill=1)
+
+class BarcodeForm(NamedTuple):
+    # Código ya codificado: tamaño del formulario (pt) y las barras como
+    # operadores PDF listos para el canvas
+    modules: str
+    width: float
+    height: float
+    ops: str
+
+class PreparedLabel(NamedTuple):
+    # Lo que se calcula de una etiqueta antes de dibujarla: el código (un
+    # BarcodeForm o los bytes del PNG; None si el código ya se pidió antes en
+    # el documento) y el título ya acomodado
+    barcode: object
+    title_size: int
+    title_lines: list
+
+@lru_cache(maxsize=64)
+def _bar_strings(count, options_key):
+    # fp_str de ReportLab (sin rl_accel es Python puro) es lo más caro de
+    # dibujar las barras. Con la misma cantidad de módulos las posiciones y
+    # anchos posibles se repiten, así se formatean una sola vez
+    from reportlab.lib.rl_accel import fp_str
+    options = dict(options_key)
+    total_w = 2*options['quiet_zone'] + count*options['module_width']
+    total_h = 2*BARCODE_MARGIN + options['module_height']
+    # Mismas cuentas que draw_barcode_vector con la caja del formulario
+    sx = total_w*mm / total_w
+    sy = total_h*mm / total_h
+    module_w = options['module_width'] * sx
+    xs = [fp_str(0 + options['quiet_zone']*sx + pos*module_w) for pos in range(count)]
+    ws = [fp_str(n*module_w) for n in range(count + 1)]
+    return xs, ws, fp_str(0 + BARCODE_MARGIN*sy), fp_str(options['module_height']*sy)
+
+def barcode_form(code, options=BARCODE_OPTIONS):
+    generator, code = barcode_generator(code)
+    modules = generator.build()[0]
+    xs, ws, bar_y, bar_h = _bar_strings(len(modules), tuple(sorted(options.items())))
+    # Igual que beginPath + rect por barra + drawPath en ReportLab
+    ops = ['n']
+    pos = 0
+    for mod, run in groupby(modules):
+        n = len(list(run))
+        if mod != '0':
+            ops.append(f"{xs[pos]} {bar_y} {ws[n]} {bar_h} re")
+        pos += n
+    return BarcodeForm(modules, (2*options['quiet_zone'] + len(modules)*options['module_width'])*mm,
+                       (2*BARCODE_MARGIN + options['module_height'])*mm, ' '.join(ops))
+
+def barcode_png(code, options=BARCODE_OPTIONS):
+    from barcode.writer import ImageWriter
+    generator, code = barcode_generator(code, writer=ImageWriter())
+    buf = io.BytesIO()
+    generator.write(buf, options=dict(options))
+    return buf.getvalue()
+
+def fit_label_title(title, price, label_w=LABEL_W, label_h=LABEL_H):
+    # Tamaño y renglones del título en el espacio entre el precio y el código de barras
+    max_title_width = label_w / 2 - 7*mm
+    available_height = label_h - 6*mm - (5*mm if price else 0) - 18*mm
+    if available_height < TITLE_MIN_SIZE + TITLE_LEADING:
+        available_height = TITLE_MIN_SIZE + TITLE_LEADING
+    return fit_title(title, max_title_width, available_height)
+
+def prepare_labels(items, label_w=LABEL_W, label_h=LABEL_H, backend='vector'):
+    # Parte de una etiqueta que no toca el canvas; corre en el proceso de
+    # prefetch (o en el mismo, con prefetch=0). items: (record, encode); el
+    # código solo se codifica si encode, los repetidos los resuelve BarcodeCache
+    prepared = []
+    for record, encode in items:
+        barcode = None
+        if encode:
+            barcode = barcode_form(record.code) if backend == 'vector' else barcode_png(record.code)
+        prepared.append(PreparedLabel(barcode, *fit_label_title(record.title, record.price, label_w, label_h)))
+    return prepared
+
+def prefetch(items, prepare, depth=PREFETCH_DEPTH, executor=None, timer=NULL_TIMER):
+    # Devuelve (item, preparado) en el orden de items. Con executor, los items
+    # se mandan a preparar en bloques y se mantienen hasta depth adelantados,
+    # así el executor prepara mientras quien consume dibuja los anteriores
+    if executor is None or depth < 1:
+        for item in items:
+            with timer.stage('prepare'):
+                prepared = prepare([item])[0]
+            yield item, prepared
+        return
+    items = iter(items)
+    chunk = max(1, min(PREFETCH_CHUNK, depth))
+    pending = deque()
+    ahead = 0
+    while True:
+        while ahead < depth:
+            block = list(islice(items, chunk))
+            if not block:
+                break
+            pending.append((block, executor.submit(prepare, block)))
+            ahead += len(block)
+        if not pending:
+            return
+        block, future = pending.popleft()
+        ahead -= len(block)
+        with timer.stage('prepare'):
+            prepared = future.result()
+        yield from zip(block, prepared)
+
+def load_print_image(path, width, height, dpi=PRINT_DPI):
+    # Decodifica la imagen una sola vez y la reduce al tamaño de impresión (en puntos)
+    from PIL import Image
+    img = Image.open(path)
+    img.load()
+    if img.mode not in ('RGB', 'RGBA', 'L'):
+        img = img.convert('RGBA')
+    img.thumbnail(print_pixels(width, height, dpi), Image.LANCZOS)
+    return img
+
+def print_pixels(width, height, dpi):
+    return max(1, round(width / 72 * dpi)), max(1, round(height / 72 * dpi))
+
+def fit_print_image(img, width, height, dpi):
+    # Copia reducida si la imagen tiene más píxeles de los que se imprimen a dpi
+    from PIL import Image
+    size = print_pixels(width, height, dpi)
+    if img.width <= size[0] and img.height <= size[1]:
+        return img
+    img = img.copy()
+    img.thumbnail(size, Image.LANCZOS)
+    return img
+
+class PrintProfile(NamedTuple):
+    name: str
+    dpi: int
+    description: str
+
+PRINT_PROFILES = {p.name: p for p in (
+    PrintProfile('draft', 150, "borrador: logo e icono a 150 dpi"),
+    PrintProfile('production', PRINT_DPI, "producción: logo e icono a 300 dpi"),
+)}
+DEFAULT_PRINT_PROFILE = 'production'
+
+class BarcodeCache:
+    # Caché LRU de códigos ya codificados y embebidos en un documento: en modo
+    # vector guarda el nombre del formulario PDF, en modo png el ImageReader.
+    def __init__(self, c, backend='vector', maxsize=BARCODE_CACHE_SIZE, options=BARCODE_OPTIONS, timer=NULL_TIMER):
+        if backend not in BARCODE_BACKENDS:
+            raise ValueError(f"Backend de código de barras desconocido: {backend}")
+        self.c = c
+        self.timer = timer
+        self.backend = backend
+        self.maxsize = maxsize
+        self.options = options
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._options_key = tuple(sorted(options.items()))
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def draw(self, code, x, y, width, height, symbology=None, prepared=None):
+        # prepared: BarcodeForm o PNG ya generado por prepare_labels
+        if symbology is None:
+            symbology, code = barcode_symbology(code)
+        key = (symbology, code, self._options_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            with self.timer.stage('barcode_encode'):
+                entry = self._render(code, prepared)
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        with self.timer.stage('barcode_draw'):
+            if self.backend == 'vector':
+                name, form_w, form_h = entry
+                self.c.saveState()
+                self.c.translate(x, y)
+                self.c.scale(width / form_w, height / form_h)
+                self.c.doForm(name)
+                self.c.restoreState()
+            else:
+                self.c.drawImage(entry, x, y, width=width, height=height, mask='auto')
+        return code
+
+    def _render(self, code, prepared=None):
+        if self.backend == 'vector':
+            form = prepared or barcode_form(code, self.options)
+            name = f"barcode{self._next_id}"
+            self._next_id += 1
+            self.c.beginForm(name, 0, 0, form.width, form.height)
+            self.c.setFillColorRGB(0, 0, 0)
+            if hasattr(self.c, 'addLiteral'):
+                # Relleno par-impar, como drawPath por defecto
+                self.c.addLiteral(form.ops)
+                self.c.addLiteral('f*')
+            else:
+                # RasterCanvas no interpreta operadores PDF
+                draw_barcode_vector(self.c, form.modules, 0, 0, form.width, form.height, self.options)
+            self.c.endForm()
+            return name, form.width, form.height
+        from reportlab.lib.utils import ImageReader
+        return ImageReader(io.BytesIO(prepared or barcode_png(code, self.options)))
+
+def chunk_path(output, index):
+    root, ext = os.path.splitext(output)
+    return f"{root}_{index:04d}{ext or '.pdf'}"
+
+class RenderCancelled(Exception):
+    pass
+
+class RenderResult:
+    def __init__(self):
+        self.outputs = []
+        self.labels = 0
+        self.pages = 0
+        self.barcode_hits = 0
+        self.barcode_misses = 0
+        self.timer = NULL_TIMER
+
+    @property
+    def hit_rate(self):
+        total = self.barcode_hits + self.barcode_misses
+        return self.barcode_hits / total if total else 0.0
+
+    @property
+    def bytes_per_label(self):
+        # None si la salida no quedó en archivos (p. ej. ZPL enviado a tcp://)
+        files = [path for path in self.outputs if os.path.isfile(path)]
+        if not files or not self.labels:
+            return None
+        return sum(os.path.getsize(path) for path in files) / self.labels
+
+class LabelRenderer:
+    # Dibuja la hoja de etiquetas sin depender de la interfaz gráfica. logo e
+    # icon aceptan una ruta o una imagen PIL ya reducida con load_print_image.
+    def __init__(self, logo=None, icon=None, barcode_backend='vector', timer=None, sheet=DEFAULT_SHEET,
+                 print_profile=DEFAULT_PRINT_PROFILE, prefetch=0):
+        # timer: StageTimer para medir cada etapa; por defecto se activa con
+        # ETIQUETAS_PROFILE=1 en el entorno. prefetch: etiquetas que un proceso
+        # aparte prepara por adelantado en render (0: se preparan al dibujarlas)
+        self.timer = timer if timer is not None else timer_from_env()
+        if prefetch < 0:
+            raise ValueError("prefetch no puede ser negativo")
+        self.prefetch = prefetch
+        if print_profile not in PRINT_PROFILES:
+            raise ValueError(f"Perfil de impresión desconocido: {print_profile} "
+                             f"(disponibles: {', '.join(PRINT_PROFILES)})")
+        self.print_profile = PRINT_PROFILES[print_profile]
+        self.barcode_backend = barcode_backend
+
+        # La etiqueta se dibuja siempre a LABEL_W × LABEL_H; la plantilla de hoja
+        # decide dónde va cada una y si hay que achicarla para que quepa
+        self.sheet = load_sheet(sheet)
+        self.page_w, self.page_h = self.sheet.page_w*mm, self.sheet.page_h*mm
+        self.label_w, self.label_h = LABEL_W, LABEL_H
+        self.label_scale, self.placements = self.sheet.placements(self.label_w, self.label_h)
+        self.max_per_page = len(self.placements)
+
+        # Logo e icono se reducen a los píxeles que realmente se imprimen con el
+        # perfil elegido (en hojas chicas la etiqueta se achica y también ellos)
+        with self.timer.stage('assets'):
+            self.logo = self._load_asset(logo, LOGO_SIZE * self.label_scale)
+            self.icon = self._load_asset(icon, ICON_SIZE * self.label_scale)
+        from reportlab.lib.utils import ImageReader
+        self.logo_image = ImageReader(self.logo) if self.logo else None
+        self.whatsapp_image = ImageReader(self.icon) if self.icon else None
+        self._fingerprint = None
+        self._stamps = 0
+
+    def fingerprint(self):
+        # Huella de todo lo que, además de las etiquetas, cambia el dibujo de una página
+        if self._fingerprint is None:
+            h = hashlib.sha256(repr((
+                LAYOUT_VERSION, self.barcode_backend, sorted(BARCODE_OPTIONS.items()),
+                self.label_w, self.label_h, self.label_scale, self.placements,
+                self.page_w, self.page_h, self.print_profile,
+            )).encode())
+            for img in (self.logo, self.icon):
+                if img is None:
+                    h.update(b'-')
+                else:
+                    h.update(f"{img.mode}{img.size}".encode())
+                    h.update(img.tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def _load_asset(self, asset, size):
+        dpi = self.print_profile.dpi
+        if isinstance(asset, (str, os.PathLike)):
+            return load_print_image(asset, size, size, dpi)
+        if asset is not None:
+            return fit_print_image(asset, size, size, dpi)
+        return asset
+
+    def _draw_left_column(self, c, label_w, label_h, logo, icon):
+        # Columna izquierda (logo, datos, teléfonos), en coordenadas de la etiqueta
+        left_w = label_w / 2
+        left_center = left_w / 2
+        content_top = label_h
+        icon_size = ICON_SIZE
+        phone_nums = ['712 162 6915', '712 159 0891']
+
+        logo_w = logo_h = LOGO_SIZE
+
+        if logo:
+            logo_x = left_center - logo_w / 2
+            logo_y = content_top - logo_h - 2*mm
+            c.drawImage(logo, logo_x, logo_y, width=logo_w, height=logo_h,
+                        preserveAspectRatio=True, mask='auto')
+            text_y = logo_y - 4*mm
+        else:
+            text_y = content_top - 10*mm
+
+        min_text_y = 12*mm
+        if text_y < min_text_y:
+            text_y = min_text_y
+
+        c.setFont('Helvetica-Bold', 9)
+        c.drawCentredString(left_center, text_y, 'TIMILPAN Y ACULCO')
+        text_y -= 5*mm
+
+        c.setFont('Helvetica', 7)
+        email = 'mueblescarrillo59@gmail.com'
+        c.drawCentredString(left_center, text_y, email)
+        text_y -= 5*mm
+
+        min_phone_y = 4*mm
+        needed_height = len(phone_nums) * (icon_size + 2*mm)
+        if text_y - needed_height < min_phone_y:
+            phone_spacing = icon_size + 1*mm
+        else:
+            phone_spacing = 4*mm
+
+        for phone in phone_nums:
+            if icon:
+                icon_x = left_center - (c.stringWidth(phone, 'Helvetica', 8)/2) - icon_size - 1*mm
+                c.drawImage(icon, icon_x, text_y - icon_size/2,
+                            width=icon_size, height=icon_size, preserveAspectRatio=True, mask='auto')
+                c.setFont('Helvetica', 8)
+                c.drawString(icon_x + icon_size + 1*mm, text_y, phone)
+            else:
+                c.setFont('Helvetica', 8)
+                c.drawCentredString(left_center, text_y, phone)
+            text_y -= phone_spacing
+
+    def render(self, lines, output, chunk_pages=None, progress=None, cancel=None):
+        # lines puede ser cualquier iterable (p. ej. un archivo abierto) y se
+        # consume de a una línea. Con chunk_pages la salida se parte en archivos
+        # de N páginas (salida_0001.pdf, salida_0002.pdf, ...) que se guardan en
+        # cuanto se llenan, así la memoria no crece con el largo de la lista.
+        # progress(etiquetas) se llama al completar cada página; si el evento
+        # cancel se activa se borran los archivos ya escritos y se lanza RenderCancelled.
+        if chunk_pages is not None and chunk_pages < 1:
+            raise ValueError("chunk_pages debe ser al menos 1")
+        labels_per_file = chunk_pages * self.max_per_page if chunk_pages else None
+        result = RenderResult()
+        c = barcodes = None
+        pos = 0
+        # Códigos y títulos se preparan en otro proceso mientras este dibuja
+        pool = None
+        if self.prefetch:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(1)
+        prepare = partial(prepare_labels, label_w=self.label_w, label_h=self.label_h,
+                          backend=self.barcode_backend)
+        try:
+            records = self._records(lines)
+            if self.prefetch:
+                planned = self._plan(records, labels_per_file)
+            else:
+                # Sin prefetch BarcodeCache codifica solo lo que le falta, al dibujar
+                planned = ((record, False) for record in records)
+            for (item, _), prepared in prefetch(planned, prepare, self.prefetch, pool, self.timer):
+                # Con cantidad > 1 la etiqueta se dibuja una vez como formulario
+                # y se estampa en los lugares consecutivos
+                stamp = None
+                for _ in range(item.quantity):
+                    if cancel is not None and cancel.is_set():
+                        raise RenderCancelled()
+                    if labels_per_file and pos == labels_per_file:
+                        self._close(c, barcodes, result)
+                        c = None
+                    if c is None:
+                        path = chunk_path(output, len(result.outputs) + 1) if chunk_pages else output
+                        c, barcodes = self._open(path)
+                        result.outputs.append(path)
+                        pos = 0
+                        stamp = None
+                    pos_in_page = pos % self.max_per_page
+                    if pos_in_page == 0 and pos > 0:
+                        with self.timer.stage('page'):
+                            c.showPage()
+                        if progress:
+                            progress(result.labels)
+                    if pos_in_page == 0:
+                        result.pages += 1
+                    if stamp is None and item.quantity > 1:
+                        stamp = self._define_stamp(c, barcodes, item, prepared)
+                    x, y = self.placements[pos_in_page]
+                    self._draw_slot(c, barcodes, x, y, item, stamp, prepared)
+                    result.labels += 1
+                    pos += 1
+        except RenderCancelled:
+            for path in result.outputs:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        if c is not None:
+            self._close(c, barcodes, result)
+        if progress:
+            progress(result.labels)
+        result.timer = self.timer
+        return result
+
+    def _records(self, lines):
+        # Acepta Records (iter_records ya descarta las filas con errores) o
+        # líneas de texto; lo que no se puede imprimir corta con ValueError
+        for line_no, item in enumerate(lines, 1):
+            with self.timer.stage('parse'):
+                if not isinstance(item, Record):
+                    if not item.strip():
+                        continue
+                    item = parse_line(item, line_no)
+                check_record(item)
+            yield item
+
+    def _plan(self, records, labels_per_file=None):
+        # Solo se manda a codificar un código si BarcodeCache no lo tiene: se
+        # sigue su mismo LRU y se vacía al empezar cada archivo, así la memoria
+        # no crece con el largo de la lista. Si el plan se equivoca, BarcodeCache
+        # codifica él lo que le falte.
+        seen = OrderedDict()
+        pos = 0
+        current_file = 0
+        for record in records:
+            if labels_per_file and pos // labels_per_file != current_file:
+                current_file = pos // labels_per_file
+                seen.clear()
+            pos += record.quantity
+            key = (record.symbology, record.code)
+            encode = key not in seen
+            seen[key] = None
+            seen.move_to_end(key)
+            if len(seen) > BARCODE_CACHE_SIZE:
+                seen.popitem(last=False)
+            yield record, encode
+
+    def render_image(self, line, dpi=144):
+        # Vista previa de una etiqueta rasterizada directo a una imagen PIL, con
+        # el mismo dibujo que el PDF (sin pasar por un PDF temporal ni poppler)
+        from .raster import RasterCanvas
+        c = RasterCanvas(self.label_w, self.label_h, dpi=dpi)
+        barcodes = BarcodeCache(c, 'vector')
+        self._define_forms(c, self.logo, self.icon)
+        record = line if isinstance(line, Record) else parse_line(line)
+        self._draw_label(c, barcodes, 0, 0, record)
+        return c.image
+
+    def render_page_image(self, records, dpi=60):
+        # Vista previa de una hoja completa: las etiquetas de una página (p. ej.
+        # un bloque de iter_shards) en sus lugares de la plantilla, rasterizadas
+        # con el mismo dibujo que el PDF
+        from .raster import RasterCanvas
+        c = RasterCanvas(self.page_w, self.page_h, dpi=dpi, margin=0)
+        barcodes = BarcodeCache(c, 'vector')
+        self._define_forms(c, self.logo, self.icon)
+        slots = iter(self.placements)
+        for record in records:
+            stamp = None
+            for _ in range(record.quantity):
+                slot = next(slots, None)
+                if slot is None:
+                    raise ValueError(f"La página tiene más etiquetas que lugares en la hoja ({self.max_per_page})")
+                if stamp is None and record.quantity > 1:
+                    stamp = self._define_stamp(c, barcodes, record)
+                self._draw_slot(c, barcodes, *slot, record, stamp)
+        return c.image
+
+    def _open(self, path):
+        from reportlab.pdfgen import canvas
+        c = canvas.Canvas(path, pagesize=(self.page_w, self.page_h),
+                          pageCompression=1)
+        barcodes = BarcodeCache(c, self.barcode_backend, timer=self.timer)
+        with self.timer.stage('forms'):
+            self._define_forms(c, self.logo_image, self.whatsapp_image)
+        return c, barcodes
+
+    def _define_forms(self, c, logo, icon):
+        # Marco y columna izquierda son iguales en todas las etiquetas: se dibujan
+        # una sola vez como formulario y cada etiqueta solo lo referencia (la caja
+        # del formulario se amplía 1 pt para no recortar el trazo del marco)
+        label_w, label_h = self.label_w, self.label_h
+        c.beginForm('left_column', -1, -1, label_w + 1, label_h + 1)
+        c.rect(0, 0, label_w, label_h)
+        c.line(label_w/2, 0, label_w/2, label_h)
+        self._draw_left_column(c, label_w, label_h, logo, icon)
+        c.endForm()
+
+    def _close(self, c, barcodes, result):
+        with self.timer.stage('save'):
+            c.save()
+        result.barcode_hits += barcodes.hits
+        result.barcode_misses += barcodes.misses
+
+    def _define_stamp(self, c, barcodes, record, prepared=None):
+        self._stamps += 1
+        name = f"label{self._stamps}"
+        with self.timer.stage('stamp'):
+            c.beginForm(name, -1, -1, self.label_w + 1, self.label_h + 1)
+            self._draw_label(c, barcodes, 0, 0, record, prepared)
+            c.endForm()
+        return name
+
+    def _draw_slot(self, c, barcodes, x, y, record, stamp=None, prepared=None):
+        if self.label_scale != 1:
+            c.saveState()
+            c.translate(x, y)
+            c.scale(self.label_scale, self.label_scale)
+            x = y = 0
+        if stamp is None:
+            self._draw_label(c, barcodes, x, y, record, prepared)
+        else:
+            c.saveState()
+            c.translate(x, y)
+            c.doForm(stamp)
+            c.restoreState()
+        if self.label_scale != 1:
+            c.restoreState()
+
+    def _draw_label(self, c, barcodes, x, y, record, prepared=None):
+        code, title, price, symbology = record[:4]
+        label_w, label_h = self.label_w, self.label_h
+        timer = self.timer
+        with timer.stage('left_column'):
+            c.saveState()
+            c.translate(x, y)
+            c.doForm('left_column')
+            c.restoreState()
+
+        # Columna derecha (precio, TÍTULO, barcode)
+        right_x = x + label_w / 2
+        block_w = label_w / 2
+        block_center = right_x + block_w/2
+        top = y + label_h
+        current_y = top - 6*mm
+
+        # PRECIO
+        if price:
+            with timer.stage('text'):
+                c.setFont('Helvetica-Bold', 13)
+                c.setFillColorRGB(0, 0, 0)
+                price_text = f"${price}"
+                c.drawCentredString(block_center, current_y, price_text)
+            current_y -= 5*mm
+
+        # --- TÍTULO ENTRE PRECIO Y BARCODE, NUNCA SE DESBORDA ---
+        with timer.stage('title'):
+            if prepared is None:
+                title_font_size, title_lines = fit_label_title(title, price, label_w, label_h)
+            else:
+                title_font_size, title_lines = prepared.title_size, prepared.title_lines
+
+            for text_line in title_lines:
+                c.setFont(TITLE_FONT, title_font_size)
+                c.setFillColorRGB(0, 0, 0)
+                c.drawCentredString(block_center, current_y, text_line)
+                current_y -= (title_font_size + TITLE_LEADING)
+            current_y -= 2*mm
+
+        # CÓDIGO DE BARRAS
+        bar_w = block_w - 8*mm
+        bar_h = 14*mm
+        bar_x = right_x + (block_w - bar_w)/2
+        bar_y = current_y - bar_h + 3*mm
+        barcodes.draw(code, bar_x, bar_y, bar_w, bar_h, symbology, prepared and prepared.barcode)
+        with timer.stage('text'):
+            c.setFont('Helvetica', 8)
+            c.setFillColorRGB(0, 0, 0)
+            c.drawCentredString(block_center, bar_y - 3*mm, code)
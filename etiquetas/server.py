@@ -0,0 +1,430 @@
+import io
+import json
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .layout import TITLE_FONT, char_widths
+from .parallel import iter_shards, merge_pdfs
+from .profiling import NULL_TIMER, percentile
+from .records import has_errors, iter_field_records, iter_records, parse_line
+from .render import DEFAULT_PRINT_PROFILE, ICON_SIZE, LABEL_H, LABEL_W, LOGO_SIZE, PRINT_PROFILES, \
+    LabelRenderer, chunk_path, load_print_image
+from .sheets import DEFAULT_SHEET, SHEETS, load_sheet
+from .sources import csv_table, iter_table_fields, parse_mapping, resolve_mapping
+from .zpl import ZPL_DPIS, ZplRenderer
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Páginas (PDF) o etiquetas (ZPL) por tarea: los trabajos se atienden por
+# turnos de a una tarea, así uno grande no deja esperando a los chicos
+SHARD_PAGES = 5
+ZPL_SHARD_LABELS = 500
+# Trabajos aceptados a la vez; los que sobran reciben 503
+MAX_JOBS = 32
+MAX_BODY = 20 * 1024 * 1024
+# Trabajos recientes con los que se calculan los percentiles de latencia
+LATENCY_SAMPLES = 1000
+
+_worker_assets = (None, None)
+_worker_renderers = {}
+
+
+def _init_worker(logo, icon, sheet, print_profile, dpi):
+    # Cada proceso decodifica logo e icono y carga las métricas de las fuentes
+    # una sola vez; una etiqueta de prueba deja todo listo para el primer pedido
+    global _worker_assets
+    # Ctrl+C lo atiende el proceso principal, que cierra el grupo en orden
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_assets = (logo, icon)
+    for font in ('Helvetica', 'Helvetica-Bold', TITLE_FONT):
+        char_widths(font)
+    _pdf_renderer(sheet, print_profile).render([parse_line('ETIQUETAS;Muestra;1')], io.BytesIO())
+    _zpl_renderer(dpi).graphics_commands()
+
+
+def _pdf_renderer(sheet, print_profile):
+    key = ('pdf', sheet, print_profile)
+    renderer = _worker_renderers.get(key)
+    if renderer is None:
+        logo, icon = _worker_assets
+        renderer = _worker_renderers[key] = LabelRenderer(logo=logo, icon=icon, timer=NULL_TIMER,
+                                                          sheet=sheet, print_profile=print_profile)
+    return renderer
+
+
+def _zpl_renderer(dpi):
+    key = ('zpl', dpi)
+    renderer = _worker_renderers.get(key)
+    if renderer is None:
+        logo, icon = _worker_assets
+        renderer = _worker_renderers[key] = ZplRenderer(logo=logo, icon=icon, dpi=dpi, timer=NULL_TIMER)
+    return renderer
+
+
+def _render_pdf_shard(records, path, sheet, print_profile):
+    result = _pdf_renderer(sheet, print_profile).render(records, path)
+    return result.labels, result.pages
+
+
+def _render_zpl_shard(records, dpi, graphics):
+    # Los gráficos (~DG) van solo al principio del primer bloque del trabajo
+    renderer = _zpl_renderer(dpi)
+    out = [renderer.graphics_commands()] if graphics else []
+    out.extend(renderer.label_format(record) for record in records)
+    return ''.join(out).encode('utf-8')
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class Job:
+    # Un pedido partido en bloques; results guarda lo que devuelve cada bloque
+    def __init__(self, kind, shards, options):
+        self.kind = kind
+        self.shards = shards
+        self.options = options
+        self.results = [None] * len(shards)
+        self.next_index = 0
+        self.running = 0
+        self.error = None
+        self.done = threading.Event()
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.tmpdir = tempfile.mkdtemp(prefix='etiquetas-') if kind == 'pdf' else None
+
+    @property
+    def labels(self):
+        return sum(record.quantity for shard in self.shards for record in shard)
+
+    @property
+    def pages(self):
+        # Hojas del PDF; en ZPL, formatos ^XA...^XZ
+        if self.kind == 'pdf':
+            return sum(pages for _, pages in self.results)
+        return sum(len(shard) for shard in self.shards)
+
+    def task(self, index):
+        shard = self.shards[index]
+        if self.kind == 'pdf':
+            return (_render_pdf_shard, shard, self.shard_path(index),
+                    self.options['sheet'], self.options['print_profile'])
+        return _render_zpl_shard, shard, self.options['dpi'], index == 0
+
+    def shard_path(self, index):
+        return chunk_path(os.path.join(self.tmpdir, 'shard.pdf'), index + 1)
+
+
+class LabelService:
+    # Cola de trabajos sobre un grupo fijo de procesos. Nunca hay más bloques
+    # en vuelo que procesos y el siguiente bloque se toma por turnos de los
+    # trabajos activos (round robin), así un pedido chico espera a lo sumo un
+    # bloque de cada trabajo grande y no a que terminen enteros.
+    def __init__(self, logo=None, icon=None, workers=None, sheet=DEFAULT_SHEET,
+                 print_profile=DEFAULT_PRINT_PROFILE, dpi=203, max_jobs=MAX_JOBS, shard_pages=SHARD_PAGES):
+        if print_profile not in PRINT_PROFILES:
+            raise ValueError(f"Perfil de impresión desconocido: {print_profile} "
+                             f"(disponibles: {', '.join(PRINT_PROFILES)})")
+        if dpi not in ZPL_DPIS:
+            raise ValueError(f"Resolución ZPL no soportada: {dpi} (use {' o '.join(map(str, ZPL_DPIS))})")
+        if shard_pages < 1:
+            raise ValueError("shard_pages debe ser al menos 1")
+        self.workers = workers or os.cpu_count() or 1
+        self.sheet = load_sheet(sheet)
+        self.print_profile = print_profile
+        self.dpi = dpi
+        self.max_jobs = max_jobs
+        self.shard_pages = shard_pages
+        # Se decodifican aquí a la resolución más alta que se usa; cada proceso
+        # las reduce para su hoja y perfil
+        if isinstance(logo, (str, os.PathLike)):
+            logo = load_print_image(logo, LOGO_SIZE, LOGO_SIZE)
+        if isinstance(icon, (str, os.PathLike)):
+            icon = load_print_image(icon, ICON_SIZE, ICON_SIZE)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(logo, icon, self.sheet, print_profile, dpi))
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._active = 0
+        self._in_flight = 0
+        self._started = time.time()
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._waits = deque(maxlen=LATENCY_SAMPLES)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.labels = 0
+
+    def options(self, kind, query):
+        # Opciones de un pedido a partir de los parámetros de la URL; solo se
+        # aceptan plantillas incluidas, nunca rutas del servidor
+        options = {'sheet': self.sheet, 'print_profile': self.print_profile, 'dpi': self.dpi}
+        if 'sheet' in query:
+            if query['sheet'] not in SHEETS:
+                raise ValueError(f"Plantilla de hoja desconocida: {query['sheet']} "
+                                 f"(disponibles: {', '.join(SHEETS)})")
+            options['sheet'] = SHEETS[query['sheet']]
+        if 'profile' in query:
+            if query['profile'] not in PRINT_PROFILES:
+                raise ValueError(f"Perfil de impresión desconocido: {query['profile']} "
+                                 f"(disponibles: {', '.join(PRINT_PROFILES)})")
+            options['print_profile'] = query['profile']
+        if 'dpi' in query:
+            if query['dpi'] not in [str(dpi) for dpi in ZPL_DPIS]:
+                raise ValueError(f"Resolución ZPL no soportada: {query['dpi']} "
+                                 f"(use {' o '.join(map(str, ZPL_DPIS))})")
+            options['dpi'] = int(query['dpi'])
+        return options
+
+    def submit(self, kind, records, options):
+        if kind == 'pdf':
+            per_page = len(options['sheet'].placements(LABEL_W, LABEL_H)[1])
+            size = self.shard_pages * per_page
+        else:
+            size = ZPL_SHARD_LABELS
+        with self._lock:
+            if self._active >= self.max_jobs:
+                self.rejected += 1
+                raise ServiceBusy(f"Hay {self._active} trabajos en curso; intente de nuevo en unos segundos")
+            self._active += 1
+        try:
+            job = Job(kind, list(iter_shards(records, size)), options)
+        except BaseException:
+            # Sin esto el lugar queda ocupado y el servicio termina rechazando todo
+            with self._lock:
+                self._active -= 1
+            raise
+        with self._lock:
+            self._queue.append(job)
+        self._dispatch()
+        return job
+
+    def run(self, kind, records, options):
+        # Encola el pedido, espera a que terminen todos sus bloques y devuelve
+        # el PDF o ZPL completo
+        job = self.submit(kind, records, options)
+        job.done.wait()
+        try:
+            if job.error is not None:
+                raise job.error
+            if kind == 'pdf':
+                data = self._join_pdf(job)
+            else:
+                data = b''.join(job.results)
+        except Exception:
+            self._finish(job, ok=False)
+            raise
+        self._finish(job, ok=True)
+        return data, job
+
+    def _join_pdf(self, job):
+        paths = [job.shard_path(index) for index in range(len(job.shards))]
+        if len(paths) == 1:
+            path = paths[0]
+        else:
+            path = os.path.join(job.tmpdir, 'salida.pdf')
+            merge_pdfs(paths, path)
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def _finish(self, job, ok):
+        if job.tmpdir:
+            shutil.rmtree(job.tmpdir, ignore_errors=True)
+        with self._lock:
+            self._active -= 1
+            if ok:
+                self.completed += 1
+                self.labels += job.labels
+                self._latencies.append(time.perf_counter() - job.submitted)
+            else:
+                self.failed += 1
+
+    def _dispatch(self):
+        submitted = []
+        with self._lock:
+            while self._in_flight < self.workers and self._queue:
+                job = self._queue.popleft()
+                index = job.next_index
+                job.next_index += 1
+                if job.started is None:
+                    job.started = time.perf_counter()
+                    self._waits.append(job.started - job.submitted)
+                fn, *args = job.task(index)
+                submitted.append((self._pool.submit(fn, *args), job, index))
+                job.running += 1
+                self._in_flight += 1
+                # Al final de la fila: el próximo bloque es de otro trabajo
+                if job.next_index < len(job.shards):
+                    self._queue.append(job)
+        # Fuera del candado: si el bloque ya terminó, el callback corre aquí mismo
+        for future, job, index in submitted:
+            future.add_done_callback(partial(self._shard_done, job, index))
+
+    def _shard_done(self, job, index, future):
+        with self._lock:
+            self._in_flight -= 1
+            job.running -= 1
+            error = RuntimeError("El servicio se detuvo") if future.cancelled() else future.exception()
+            if error is not None:
+                if job.error is None:
+                    job.error = error
+                # Un bloque con error cancela el resto del trabajo
+                if job in self._queue:
+                    self._queue.remove(job)
+                job.next_index = len(job.shards)
+            else:
+                job.results[index] = future.result()
+            if job.running == 0 and job.next_index == len(job.shards):
+                job.done.set()
+        self._dispatch()
+
+    def metrics(self):
+        with self._lock:
+            queued = [job for job in self._queue if job.started is None]
+            return {
+                'workers': self.workers,
+                'uptime_s': round(time.time() - self._started, 1),
+                'jobs_active': self._active,
+                'jobs_queued': len(queued),
+                'shards_queued': sum(len(job.shards) - job.next_index for job in self._queue),
+                'shards_running': self._in_flight,
+                'jobs_completed': self.completed,
+                'jobs_failed': self.failed,
+                'jobs_rejected': self.rejected,
+                'labels': self.labels,
+                'latency_ms': latency_summary(self._latencies),
+                'queue_wait_ms': latency_summary(self._waits),
+            }
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+def latency_summary(samples):
+    ordered = sorted(samples)
+    summary = {'count': len(ordered)}
+    for pct in (50, 90, 99):
+        summary[f"p{pct}"] = round(percentile(ordered, pct) * 1000, 1)
+    summary['max'] = round(ordered[-1] * 1000, 1) if ordered else 0.0
+    return summary
+
+
+def parse_body(content_type, body, mapping=None, issues=None):
+    # Records de un pedido: JSON (lista de objetos con columnas, o de líneas
+    # código;título;precio), CSV con encabezado, o texto con una etiqueta por línea
+    mapping = parse_mapping(mapping) if mapping else None
+    text = body.decode('utf-8-sig')
+    if content_type == 'application/json':
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get('records')
+        if not isinstance(data, list):
+            raise ValueError("El JSON debe ser una lista de etiquetas o un objeto con 'records'")
+        if all(isinstance(item, str) for item in data):
+            return list(iter_records(data, issues))
+        if not all(isinstance(item, dict) for item in data):
+            raise ValueError("Las etiquetas del JSON deben ser todas objetos o todas líneas de texto")
+        header = list(dict.fromkeys(key for item in data for key in item))
+        rows = [[item.get(key) for key in header] for item in data]
+    elif content_type in ('text/csv', 'text/tab-separated-values'):
+        delimiter = '\t' if content_type == 'text/tab-separated-values' else None
+        header, rows = csv_table(io.StringIO(text, newline=''), delimiter)
+    else:
+        return list(iter_records(text.splitlines(), issues))
+    # El mapeo que guardó la interfaz en esta máquina no vale para los clientes HTTP
+    mapping = resolve_mapping(header, mapping, use_saved=False)
+    return list(iter_field_records(iter_table_fields(header, rows, mapping), issues))
+
+
+class LabelRequestHandler(BaseHTTPRequestHandler):
+    # POST /render -> PDF, POST /zpl -> ZPL, GET /metrics -> métricas en JSON.
+    # Parámetros: sheet, profile, dpi y map (codigo=...,titulo=...,precio=...)
+    server_version = 'etiquetas'
+    routes = {'/render': ('pdf', 'application/pdf'), '/zpl': ('zpl', 'application/octet-stream')}
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/metrics':
+            self._send_json(200, self.server.service.metrics())
+        else:
+            self._send_json(404, {'error': "Ruta desconocida (use POST /render, POST /zpl o GET /metrics)"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in self.routes:
+            self._send_json(404, {'error': "Ruta desconocida (use POST /render, POST /zpl o GET /metrics)"})
+            return
+        kind, content_type = self.routes[url.path]
+        length = self.headers.get('Content-Length')
+        if length is None:
+            self.close_connection = True
+            self._send_json(411, {'error': "Falta el encabezado Content-Length"})
+            return
+        if not length.strip().isdigit():
+            # Un valor negativo haría que rfile.read() espere hasta que se cierre la conexión
+            self.close_connection = True
+            self._send_json(400, {'error': f"Content-Length inválido: {length}"})
+            return
+        length = int(length)
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._send_json(413, {'error': f"El pedido supera {MAX_BODY // (1024 * 1024)} MB"})
+            return
+        body = self.rfile.read(length)
+        service = self.server.service
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        issues = []
+        try:
+            options = service.options(kind, query)
+            records = parse_body(self.headers.get_content_type(), body, query.get('map'), issues)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        if has_errors(issues):
+            self._send_json(422, {'error': "La lista tiene errores; no se generó la salida.",
+                                  'issues': [issue._asdict() for issue in issues]})
+            return
+        if not records:
+            self._send_json(400, {'error': "La lista de etiquetas está vacía."})
+            return
+        try:
+            data, job = service.run(kind, records, options)
+        except ServiceBusy as e:
+            self._send_json(503, {'error': str(e)}, {'Retry-After': '5'})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"No se pudo generar: {e}"})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-Etiquetas-Labels', str(job.labels))
+        self.send_header('X-Etiquetas-Warnings', str(len(issues)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class LabelServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, LabelRequestHandler)
+        self.service = service
@@ -0,0 +1,78 @@
+import json
+import os
+from typing import NamedTuple, Optional
+
+from reportlab.lib.units import mm
+
+
+class SheetTemplate(NamedTuple):
+    # Geometría de una hoja de etiquetas, en milímetros. Si rows es None se
+    # ponen todas las filas que quepan en el alto de la página.
+    name: str
+    page_w: float
+    page_h: float
+    margin_x: float
+    margin_y: float
+    label_w: float
+    label_h: float
+    gap_x: float
+    gap_y: float
+    cols: int
+    rows: Optional[int] = None
+    description: str = ''
+
+    def row_count(self):
+        if self.rows is not None:
+            return self.rows
+        return int((self.page_h - 2*self.margin_y + self.gap_y) // (self.label_h + self.gap_y))
+
+    def placements(self, design_w, design_h):
+        # Tabla de posiciones (x, y) en puntos de cada hueco de la hoja, por
+        # filas de arriba hacia abajo. La etiqueta, diseñada a design_w × design_h,
+        # se escala sin deformar para caber en el hueco y queda centrada en él.
+        scale = min(1.0, self.label_w*mm / design_w, self.label_h*mm / design_h)
+        offset_x = (self.label_w*mm - design_w*scale) / 2
+        offset_y = (self.label_h*mm - design_h*scale) / 2
+        slots = []
+        for row in range(self.row_count()):
+            y = (self.page_h - self.margin_y - self.label_h - row*(self.label_h + self.gap_y))*mm
+            for col in range(self.cols):
+                x = (self.margin_x + col*(self.label_w + self.gap_x))*mm
+                slots.append((x + offset_x, y + offset_y))
+        return scale, tuple(slots)
+
+
+SHEETS = {t.name: t for t in (
+    SheetTemplate('muebles-a4', 210, 297, 10, 15, 95, 45, 5, 8, 2,
+                  description="A4, 2 × 5 etiquetas de 95 × 45 mm"),
+    SheetTemplate('muebles-letter', 215.9, 279.4, 10, 10, 95, 45, 5.9, 8, 2,
+                  description="Carta, 2 × 5 etiquetas de 95 × 45 mm"),
+    SheetTemplate('avery-3x8', 210, 297, 7.2, 12.9, 63.5, 33.9, 2.5, 0, 3, 8,
+                  description="A4, 3 × 8 etiquetas de 63.5 × 33.9 mm (tipo Avery L7159)"),
+    SheetTemplate('avery-4x10', 210, 297, 9.7, 21.5, 45.7, 25.4, 2.6, 0, 4, 10,
+                  description="A4, 4 × 10 etiquetas de 45.7 × 25.4 mm (tipo Avery L7654)"),
+    SheetTemplate('avery-letter-3x10', 215.9, 279.4, 4.8, 12.7, 66.7, 25.4, 3.2, 0, 3, 10,
+                  description="Carta, 3 × 10 etiquetas de 66.7 × 25.4 mm (tipo Avery 5160)"),
+)}
+DEFAULT_SHEET = 'muebles-a4'
+
+
+def load_sheet(sheet):
+    # Acepta una plantilla, el nombre de una plantilla incluida o la ruta de un
+    # JSON con los mismos campos que SheetTemplate (medidas en mm)
+    if isinstance(sheet, SheetTemplate):
+        return sheet
+    if sheet in SHEETS:
+        return SHEETS[sheet]
+    if not os.path.isfile(sheet):
+        raise ValueError(f"Plantilla de hoja desconocida: {sheet} (disponibles: {', '.join(SHEETS)})")
+    with open(sheet, encoding='utf-8') as f:
+        data = json.load(f)
+    data.setdefault('name', os.path.splitext(os.path.basename(sheet))[0])
+    try:
+        template = SheetTemplate(**data)
+    except TypeError as e:
+        raise ValueError(f"Plantilla de hoja inválida en {sheet}: {e}")
+    if template.cols < 1 or template.row_count() < 1:
+        raise ValueError(f"La plantilla {template.name} no tiene lugar para ninguna etiqueta")
+    return template
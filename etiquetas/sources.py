@@ -0,0 +1,251 @@
+import csv
+import json
+import os
+import sqlite3
+import unicodedata
+from contextlib import closing, contextmanager
+from typing import NamedTuple, Optional
+
+from .records import iter_field_records
+
+CSV_EXTENSIONS = ('.csv', '.tsv')
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+# Filas que se piden por vez a SQLite
+CHUNK_ROWS = 5000
+DEFAULT_MAPPING_PATH = os.path.join(os.path.expanduser('~'), '.config', 'etiquetas', 'columnas.json')
+
+# Nombres de columna que se reconocen sin mapeo explícito (sin acentos, en minúsculas)
+KNOWN_COLUMNS = {
+    'code': ('codigo', 'code', 'sku', 'ean', 'barcode', 'codigo de barras', 'clave'),
+    'title': ('titulo', 'title', 'descripcion', 'nombre', 'producto', 'articulo'),
+    'price': ('precio', 'price', 'precio venta', 'pvp'),
+    'quantity': ('cantidad', 'quantity', 'copias', 'cant'),
+}
+
+
+class ColumnMapping(NamedTuple):
+    # Nombre de la columna de origen para cada campo de la etiqueta
+    code: str
+    title: str
+    price: str
+    quantity: Optional[str] = None
+
+
+def is_table_source(path):
+    return path.lower().endswith(CSV_EXTENSIONS + XLSX_EXTENSIONS + SQLITE_EXTENSIONS)
+
+
+def normalize(name):
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    return ' '.join(name.lower().replace('_', ' ').split())
+
+
+def cell_text(value):
+    # Excel y SQLite devuelven números: los códigos y precios enteros no deben
+    # salir como 7.50123456789e+12 o 1299.0
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.2f}"
+    return str(value).strip()
+
+
+def parse_mapping(text):
+    # 'codigo=SKU,titulo=Nombre,precio=Precio[,cantidad=Copias]'
+    fields = {'codigo': 'code', 'código': 'code', 'titulo': 'title', 'título': 'title',
+              'precio': 'price', 'cantidad': 'quantity'}
+    values = {}
+    for part in text.split(','):
+        key, sep, column = part.partition('=')
+        field = fields.get(key.strip().lower())
+        if not sep or field is None:
+            raise ValueError(f"Mapeo de columnas inválido: {part.strip()} (use codigo=...,titulo=...,precio=...)")
+        values[field] = column.strip()
+    missing = [name for name in ('code', 'title', 'price') if name not in values]
+    if missing:
+        raise ValueError(f"Falta el mapeo de: {', '.join(missing)}")
+    return ColumnMapping(**values)
+
+
+def load_mapping(path=DEFAULT_MAPPING_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return ColumnMapping(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_mapping(mapping, path=DEFAULT_MAPPING_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(mapping._asdict(), f, indent=2, ensure_ascii=False)
+
+
+def guess_mapping(header):
+    # Columnas por nombre conocido; si no se reconocen, las tres primeras
+    names = {normalize(column): column for column in header}
+    found = {}
+    for field, aliases in KNOWN_COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                found[field] = names[alias]
+                break
+    if all(field in found for field in ('code', 'title', 'price')):
+        return ColumnMapping(**found)
+    if len(header) >= 3:
+        return ColumnMapping(*header[:3], quantity=header[3] if len(header) > 3 else None)
+    return None
+
+
+def resolve_mapping(header, mapping=None, use_saved=True):
+    # Mapeo explícito; si no hay, el guardado (si sus columnas existen en este
+    # archivo y use_saved) y si tampoco, el que se adivina por los nombres
+    if mapping is not None:
+        missing = [column for column in mapping if column and column not in header]
+        if missing:
+            raise ValueError(f"Columnas no encontradas: {', '.join(missing)} (disponibles: {', '.join(header)})")
+        return mapping
+    saved = load_mapping() if use_saved else None
+    if saved is not None and all(column in header for column in saved if column):
+        return saved
+    guess = guess_mapping(header)
+    if guess is None:
+        raise ValueError(f"No se pudo reconocer las columnas {', '.join(header)}; indique el mapeo")
+    return guess
+
+
+@contextmanager
+def _reading(path):
+    # Los errores propios de cada formato (zipfile y openpyxl con un .xlsx
+    # dañado, sqlite3 con una consulta inválida, csv) salen como ValueError,
+    # igual que los demás problemas de la lista
+    try:
+        yield
+    except (OSError, ValueError, ImportError):
+        raise
+    except Exception as e:
+        raise ValueError(f"No se pudo leer {os.path.basename(path)}: {e}") from e
+
+
+def read_csv(path, delimiter=None, encoding='utf-8-sig'):
+    # Devuelve (encabezado, filas); las filas se leen a medida que se consumen
+    f = open(path, newline='', encoding=encoding)
+    try:
+        with _reading(path):
+            header, reader = csv_table(f, delimiter)
+    except BaseException:
+        f.close()
+        raise
+    return header, _closing(reader, f, path)
+
+
+def csv_table(f, delimiter=None):
+    # Encabezado y lector de un CSV ya abierto (archivo o io.StringIO)
+    if delimiter is None:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+        except csv.Error:
+            delimiter = ','
+    reader = csv.reader(f, delimiter=delimiter)
+    header = [cell.strip() for cell in next(reader, [])]
+    return header, reader
+
+
+def read_xlsx(path, sheet=None):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("Para importar archivos de Excel, instale openpyxl:\npip install openpyxl")
+    # read_only recorre la hoja sin cargarla entera en memoria
+    with _reading(path):
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        with _reading(path):
+            ws = workbook[sheet] if sheet else workbook.active
+            rows = ws.iter_rows(values_only=True)
+            header = [cell_text(cell) for cell in next(rows, ())]
+    except BaseException:
+        workbook.close()
+        raise
+    return header, _closing(rows, workbook, path)
+
+
+def sqlite_tables(path):
+    with _reading(path), closing(sqlite3.connect(path)) as conn:
+        return [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name")]
+
+
+def read_sqlite(path, table=None, query=None):
+    if query is None:
+        if table is None:
+            tables = sqlite_tables(path)
+            if len(tables) != 1:
+                raise ValueError(f"Indique la tabla a importar (disponibles: {', '.join(tables) or 'ninguna'})")
+            table = tables[0]
+        query = 'SELECT * FROM "{}"'.format(table.replace('"', '""'))
+    with _reading(path):
+        conn = sqlite3.connect(path)
+        try:
+            cursor = conn.execute(query)
+        except BaseException:
+            conn.close()
+            raise
+    header = [column[0] for column in cursor.description]
+    return header, _closing(_fetch_chunks(cursor), conn, path)
+
+
+def _fetch_chunks(cursor):
+    while True:
+        rows = cursor.fetchmany(CHUNK_ROWS)
+        if not rows:
+            return
+        yield from rows
+
+
+def _closing(rows, resource, path):
+    try:
+        with _reading(path):
+            yield from rows
+    finally:
+        resource.close()
+
+
+def read_table(path, delimiter=None, sheet=None, table=None, query=None):
+    lower = path.lower()
+    if lower.endswith(XLSX_EXTENSIONS):
+        return read_xlsx(path, sheet)
+    if lower.endswith(SQLITE_EXTENSIONS):
+        return read_sqlite(path, table, query)
+    if delimiter is None and lower.endswith('.tsv'):
+        delimiter = '\t'
+    return read_csv(path, delimiter)
+
+
+def iter_table_fields(header, rows, mapping):
+    # Campos (línea, código, título, precio, cantidad) de cada fila no vacía; la
+    # línea cuenta el encabezado como 1, igual que en la planilla
+    positions = [header.index(column) if column else None for column in mapping]
+    for line_no, row in enumerate(rows, 2):
+        values = [cell_text(row[i]) if i is not None and i < len(row) else '' for i in positions]
+        if any(values):
+            yield (line_no, *values)
+
+
+def iter_table_records(path, mapping=None, issues=None, **options):
+    # Records de una planilla o base de datos, leídos en flujo: nunca se arma la
+    # lista completa ni el texto código;título;precio en memoria
+    header, rows = read_table(path, **options)
+    mapping = resolve_mapping(header, mapping)
+    return iter_field_records(iter_table_fields(header, rows, mapping), issues)
+
+
+def iter_table_lines(header, rows, mapping):
+    # Líneas código;título;precio;cantidad para la tabla de la interfaz
+    for _, *values in iter_table_fields(header, rows, mapping):
+        yield ';'.join(value.replace(';', ',') for value in values).rstrip(';')
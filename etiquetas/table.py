@@ -0,0 +1,345 @@
+import tkinter as tk
+from collections import Counter
+from tkinter import ttk
+from typing import NamedTuple
+
+from .records import ParseIssue, check_fields, parse_quantity, split_line
+
+COLUMNS = (
+    ('row', "Fila", 60, 'e'),
+    ('code', "Código", 130, 'w'),
+    ('title', "Título", 280, 'w'),
+    ('price', "Precio", 70, 'e'),
+    ('quantity', "Cant.", 50, 'e'),
+    ('status', "Estado", 220, 'w'),
+)
+# Columnas editables, en el orden de los campos de la línea
+FIELDS = ('code', 'title', 'price', 'quantity')
+
+
+class Row(NamedTuple):
+    line: str
+    code: str
+    quantity: int
+    issues: tuple
+
+
+def make_row(line):
+    # Valida la línea una sola vez al cargarla o editarla; los repetidos se
+    # cuentan aparte porque dependen del resto de la lista
+    code, title, price, quantity = split_line(line)
+    issues = tuple((issue.severity, issue.message) for issue in check_fields(code, price, 0, quantity))
+    return Row(line, code, parse_quantity(quantity) or 1, issues)
+
+
+class LabelTable(tk.Frame):
+    # Tabla virtual de etiquetas: el Treeview tiene solo tantas filas como se
+    # ven y al desplazarse se les cambian los valores. Los datos viven en
+    # self.rows (una Row por etiqueta), así 100k filas no crean 100k ítems de Tk.
+    # on_change se llama cuando cambia el contenido y on_select cuando solo se
+    # mueve la fila seleccionada (no hace falta volver a leer la lista)
+    def __init__(self, master, on_change=None, on_select=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = []
+        self.labels = 0
+        self.top = 0
+        self.selected = None
+        self.on_change = on_change
+        self.on_select = on_select
+        self._codes = Counter()
+        self._slots = []
+        self._editor = None
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in COLUMNS], show='headings',
+                                 selectmode='browse')
+        for name, heading, width, anchor in COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, anchor=anchor, stretch=name in ('title', 'status'))
+        self.tree.tag_configure('error', background='#ffd6d6')
+        self.tree.tag_configure('warning', background='#fff3c4')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Button-1>', self._on_click)
+        self.tree.bind('<Double-1>', self._on_double_click)
+        self.tree.bind('<Up>', lambda e: self._move(-1))
+        self.tree.bind('<Down>', lambda e: self._move(1))
+        self.tree.bind('<Prior>', lambda e: self._move(-len(self._slots)))
+        self.tree.bind('<Next>', lambda e: self._move(len(self._slots)))
+        self.tree.bind('<Control-Home>', lambda e: self._move(-len(self.rows)))
+        self.tree.bind('<Control-End>', lambda e: self._move(len(self.rows)))
+        self.tree.bind('<Return>', lambda e: self.edit(self.selected, 'code'))
+        self.tree.bind('<F2>', lambda e: self.edit(self.selected, 'code'))
+        self.tree.bind('<Delete>', lambda e: self.delete_row())
+        self.tree.bind('<Control-v>', lambda e: self.paste())
+
+    # --- datos ---
+
+    def set_lines(self, lines):
+        self.rows = []
+        self._codes.clear()
+        self.labels = 0
+        self.insert_lines(0, lines)
+        self.top = 0
+        self.selected = 0 if self.rows else None
+        self.refresh()
+        self._notify()
+
+    def insert_lines(self, index, lines):
+        rows = [make_row(line) for line in lines if line.strip()]
+        self.rows[index:index] = rows
+        for row in rows:
+            self._codes[row.code] += 1
+            self.labels += row.quantity
+        self.refresh()
+        return len(rows)
+
+    def set_line(self, index, line):
+        old = self.rows[index]
+        row = self.rows[index] = make_row(line)
+        self._codes[old.code] -= 1
+        self._codes[row.code] += 1
+        self.labels += row.quantity - old.quantity
+        self.refresh()
+
+    def delete_row(self, index=None):
+        index = self.selected if index is None else index
+        if index is None or not self.rows:
+            return
+        row = self.rows.pop(index)
+        self._codes[row.code] -= 1
+        self.labels -= row.quantity
+        if self.selected is not None and self.selected >= len(self.rows):
+            self.selected = len(self.rows) - 1 if self.rows else None
+        self.refresh()
+        self._notify()
+
+    def add_row(self):
+        index = len(self.rows) if self.selected is None else self.selected + 1
+        self.rows.insert(index, make_row(';;'))
+        self._codes[''] += 1
+        self.labels += 1
+        self._notify()
+        self.select(index)
+        self.edit(index, 'code')
+
+    def lines(self):
+        return [row.line for row in self.rows]
+
+    def printable_labels(self):
+        # Etiquetas que salen al generar: las filas con errores se omiten
+        return sum(row.quantity for row in self.rows if not any(s == 'error' for s, _ in row.issues))
+
+    def current_line(self):
+        # Fila seleccionada; si no hay, la primera con contenido
+        if self.selected is not None and self.selected < len(self.rows):
+            return self.rows[self.selected].line
+        return self.rows[0].line if self.rows else None
+
+    def issues(self):
+        # Problemas de toda la lista con el mismo formato que parse_records,
+        # armados con lo ya validado en cada fila
+        issues = []
+        seen = {}
+        check_duplicates = any(n > 1 for n in self._codes.values())
+        for line_no, row in enumerate(self.rows, 1):
+            issues.extend(ParseIssue(line_no, severity, message) for severity, message in row.issues)
+            if check_duplicates:
+                first = seen.setdefault(row.code, line_no)
+                if first != line_no:
+                    issues.append(ParseIssue(line_no, 'warning',
+                                             f"código {row.code} repetido (ya está en la línea {first})"))
+        return issues
+
+    def paste(self):
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return 'break'
+        index = len(self.rows) if self.selected is None else self.selected + 1
+        count = self.insert_lines(index, text.splitlines())
+        if count:
+            self._notify()
+            self.select(index + count - 1)
+        return 'break'
+
+    # --- vista ---
+
+    def refresh(self):
+        self.top = max(0, min(self.top, len(self.rows) - len(self._slots)))
+        selected_iid = None
+        for slot, iid in enumerate(self._slots):
+            index = self.top + slot
+            if index < len(self.rows):
+                row = self.rows[index]
+                code, title, price, quantity = split_line(row.line)
+                status, tags = self._status(row)
+                self.tree.item(iid, values=(index + 1, code, title, price, quantity, status), tags=tags)
+                if index == self.selected:
+                    selected_iid = iid
+            else:
+                self.tree.item(iid, values=(), tags=())
+        if selected_iid:
+            self.tree.selection_set(selected_iid)
+        else:
+            self.tree.selection_set(())
+        self.tree.yview_moveto(0)
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(self._slots)) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _status(self, row):
+        issues = list(row.issues)
+        if self._codes[row.code] > 1:
+            issues.append(('warning', "código repetido"))
+        if not issues:
+            return '', ()
+        severity = 'error' if any(s == 'error' for s, _ in issues) else 'warning'
+        return '; '.join(message for _, message in issues), (severity,)
+
+    def scroll(self, delta):
+        self._finish_edit()
+        self.top += delta
+        self.refresh()
+        return 'break'
+
+    def select(self, index):
+        if not self.rows:
+            return
+        index = max(0, min(index, len(self.rows) - 1))
+        self.selected = index
+        visible = max(1, len(self._slots))
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + visible:
+            self.top = index - visible + 1
+        self.refresh()
+        if self.on_select:
+            self.on_select()
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change()
+
+    def _move(self, delta):
+        self._finish_edit()
+        self.select((self.selected if self.selected is not None else self.top) + delta)
+        return 'break'
+
+    def _on_scrollbar(self, *args):
+        self._finish_edit()
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            step = len(self._slots) if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def _on_resize(self, event=None):
+        # Un ítem por fila visible; el alto real de fila y encabezado se mide
+        # sobre el primer ítem una vez dibujado
+        if not self._slots:
+            self._slots.append(self.tree.insert('', tk.END))
+            self.after_idle(self._on_resize)
+        bbox = self.tree.bbox(self._slots[0])
+        header, rowheight = (bbox[1], bbox[3]) if bbox else (25, 20)
+        count = max(1, (self.tree.winfo_height() - header) // rowheight)
+        if count == len(self._slots):
+            self.refresh()
+            return
+        self._finish_edit()
+        while len(self._slots) < count:
+            self._slots.append(self.tree.insert('', tk.END))
+        while len(self._slots) > count:
+            self.tree.delete(self._slots.pop())
+        self.refresh()
+
+    def _index_at(self, y):
+        iid = self.tree.identify_row(y)
+        if not iid or iid not in self._slots:
+            return None, None
+        index = self.top + self._slots.index(iid)
+        return (index, iid) if index < len(self.rows) else (None, None)
+
+    def _on_click(self, event):
+        # Los clics en los encabezados (p. ej. para cambiar el ancho) siguen normales
+        if self.tree.identify_region(event.x, event.y) != 'cell':
+            return None
+        self._finish_edit()
+        self.tree.focus_set()
+        index, _ = self._index_at(event.y)
+        if index is not None:
+            self.select(index)
+        return 'break'
+
+    def _on_double_click(self, event):
+        if self.tree.identify_region(event.x, event.y) != 'cell':
+            return None
+        index, _ = self._index_at(event.y)
+        column = COLUMNS[int(self.tree.identify_column(event.x)[1:]) - 1][0]
+        if index is not None and column in FIELDS:
+            self.edit(index, column)
+        return 'break'
+
+    # --- edición en la celda ---
+
+    def edit(self, index, column):
+        if index is None or not self.rows:
+            return 'break'
+        self._finish_edit()
+        self.select(index)
+        if not 0 <= index - self.top < len(self._slots):
+            return 'break'
+        bbox = self.tree.bbox(self._slots[index - self.top], column)
+        if not bbox:
+            return 'break'
+        fields = list(split_line(self.rows[index].line))
+        entry = ttk.Entry(self.tree)
+        entry.insert(0, fields[FIELDS.index(column)])
+        entry.select_range(0, tk.END)
+        entry.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
+        entry.focus_set()
+        self._editor = (entry, index, column)
+        entry.bind('<Return>', lambda e: self._finish_edit(move=1))
+        entry.bind('<Tab>', lambda e: self._finish_edit(next_column=1))
+        entry.bind('<Shift-Tab>', lambda e: self._finish_edit(next_column=-1))
+        entry.bind('<ISO_Left_Tab>', lambda e: self._finish_edit(next_column=-1))
+        entry.bind('<Escape>', lambda e: self._cancel_edit())
+        entry.bind('<FocusOut>', lambda e: self._finish_edit())
+        return 'break'
+
+    def _cancel_edit(self):
+        if self._editor is not None:
+            entry = self._editor[0]
+            self._editor = None
+            entry.destroy()
+            self.tree.focus_set()
+        return 'break'
+
+    def _finish_edit(self, move=0, next_column=0):
+        if self._editor is None:
+            return 'break'
+        entry, index, column = self._editor
+        self._editor = None
+        # ';' separa los campos de la línea: dentro de un campo se cambia por ','
+        value = entry.get().strip().replace(';', ',')
+        entry.destroy()
+        fields = list(split_line(self.rows[index].line))
+        if fields[FIELDS.index(column)] != value:
+            fields[FIELDS.index(column)] = value
+            self.set_line(index, ';'.join(fields).rstrip(';'))
+            self._notify()
+        self.tree.focus_set()
+        if move:
+            self.select(index + move)
+        elif next_column:
+            position = (FIELDS.index(column) + next_column) % len(FIELDS)
+            self.edit(index, FIELDS[position])
+        return 'break'
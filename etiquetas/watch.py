@@ -0,0 +1,241 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+from .records import has_errors, iter_records
+from .sources import is_table_source, iter_table_records
+
+log = logging.getLogger('etiquetas.watch')
+
+# Segundos sin archivos nuevos para cerrar un lote, y espera máxima del más viejo
+WINDOW = 5.0
+MAX_WAIT = 60.0
+POLL = 1.0
+# Segundos que un archivo debe quedar sin cambios antes de tomarlo
+SETTLE = 2.0
+MAX_BATCH_FILES = 200
+# Lotes cerrados esperando generarse; con la cola llena los pedidos nuevos se
+# quedan en la carpeta de entrada hasta que haya lugar
+MAX_QUEUED = 4
+# Lotes que se generan a la vez (comparten el grupo de procesos del servicio)
+RENDER_THREADS = 2
+WORK_DIR = '.procesando'
+ERRORS_DIR = 'errores'
+
+
+def is_order_file(name):
+    # Se ignoran ocultos y temporales que el ERP todavía está escribiendo
+    if name.startswith(('.', '~')) or name.endswith(('.tmp', '.part')):
+        return False
+    return is_table_source(name) or name.lower().endswith('.txt')
+
+
+def unique_path(directory, name):
+    root, ext = os.path.splitext(name)
+    path = os.path.join(directory, name)
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{root}-{n}{ext}")
+        n += 1
+    return path
+
+
+def read_order(path, mapping=None, issues=None):
+    if path.lower().endswith('.txt'):
+        with open(path, encoding='utf-8-sig') as f:
+            return list(iter_records(f, issues))
+    return list(iter_table_records(path, mapping, issues))
+
+
+class Batch:
+    def __init__(self):
+        # (ruta en la carpeta de trabajo, nombre original, momento en que se vio)
+        self.files = []
+        self.last_added = None
+
+    @property
+    def first_seen(self):
+        return min(seen for _, _, seen in self.files)
+
+
+class FolderWatcher:
+    # Vigila una carpeta de pedidos (CSV/XLSX/SQLite/TXT) y junta los que
+    # llegan con menos de 'window' segundos de diferencia en un solo lote, que
+    # se genera en el LabelService (grupo de procesos con logo e icono ya
+    # cargados). El PDF va a outbox y los pedidos a archive; los que tienen
+    # errores van a archive/errores junto con la lista de problemas.
+    def __init__(self, service, inbox, outbox, archive=None, mapping=None, options=None, window=WINDOW,
+                 max_wait=MAX_WAIT, poll=POLL, settle=SETTLE, max_queued=MAX_QUEUED,
+                 max_batch_files=MAX_BATCH_FILES):
+        self.service = service
+        self.inbox = inbox
+        self.outbox = outbox
+        self.archive = archive or os.path.join(inbox, 'procesados')
+        self.mapping = mapping
+        self.options = options or service.options('pdf', {})
+        self.window = window
+        self.max_wait = max_wait
+        self.poll = poll
+        self.settle = settle
+        self.max_batch_files = max_batch_files
+        self.work = os.path.join(inbox, WORK_DIR)
+        for directory in (self.outbox, self.archive, self.work):
+            os.makedirs(directory, exist_ok=True)
+        self._seen = {}
+        self._batch = Batch()
+        self._queue = queue.Queue(max_queued)
+        self._stop = threading.Event()
+        self._threads = []
+        self._backlogged = False
+        self.batches = 0
+
+    def run(self):
+        # Bloquea hasta stop() (o Ctrl+C); al salir genera el lote abierto
+        self._recover()
+        for _ in range(RENDER_THREADS):
+            thread = threading.Thread(target=self._render_loop, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        log.info("Vigilando %s -> %s (lotes de %g s, archivo en %s)",
+                 self.inbox, self.outbox, self.window, self.archive)
+        try:
+            while not self._stop.wait(self.poll):
+                self.poll_once()
+        finally:
+            if self._batch.files:
+                self._queue.put(self._batch)
+                self._batch = Batch()
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+
+    def stop(self):
+        self._stop.set()
+
+    def _recover(self):
+        # Pedidos que quedaron a medio procesar (p. ej. por un corte) vuelven a la entrada
+        for entry in os.scandir(self.work):
+            if entry.is_file():
+                os.replace(entry.path, unique_path(self.inbox, entry.name))
+                log.info("Pedido recuperado: %s", entry.name)
+
+    def poll_once(self):
+        now = time.monotonic()
+        if self._queue.full():
+            # Contrapresión: no se toman pedidos nuevos hasta que baje la cola
+            if not self._backlogged:
+                log.warning("Cola llena (%d lotes esperando); los pedidos nuevos esperan en %s",
+                            self._queue.qsize(), self.inbox)
+                self._backlogged = True
+            return
+        if self._backlogged:
+            log.info("La cola bajó; se vuelven a tomar pedidos")
+            self._backlogged = False
+        for path, seen in self._stable_files(now):
+            name = os.path.basename(path)
+            work_path = unique_path(self.work, name)
+            try:
+                os.replace(path, work_path)
+            except OSError as e:
+                log.warning("No se pudo tomar %s: %s", name, e)
+                continue
+            self._batch.files.append((work_path, name, seen))
+            self._batch.last_added = now
+            if len(self._batch.files) >= self.max_batch_files:
+                break
+        batch = self._batch
+        if batch.files and (now - batch.last_added >= self.window or now - batch.first_seen >= self.max_wait
+                            or len(batch.files) >= self.max_batch_files):
+            self._queue.put(batch)
+            self._batch = Batch()
+
+    def _stable_files(self, now):
+        # Un archivo está listo cuando su tamaño y fecha no cambiaron desde la
+        # revisión anterior ni en los últimos 'settle' segundos (el ERP terminó
+        # de escribirlo)
+        seen = {}
+        ready = []
+        wall = time.time()
+        with os.scandir(self.inbox) as entries:
+            for entry in entries:
+                if not entry.is_file() or not is_order_file(entry.name):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                previous = self._seen.get(entry.path)
+                first_seen = previous[1] if previous else now
+                seen[entry.path] = (signature, first_seen)
+                if previous and previous[0] == signature and wall - stat.st_mtime >= self.settle:
+                    ready.append((entry.path, first_seen))
+        self._seen = seen
+        ready.sort(key=lambda item: item[1])
+        return ready
+
+    def _render_loop(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            try:
+                self._render_batch(batch)
+            except Exception:
+                log.exception("Error inesperado al generar un lote")
+
+    def _render_batch(self, batch):
+        start = time.monotonic()
+        records = []
+        accepted = []
+        for path, name, _ in batch.files:
+            issues = []
+            try:
+                file_records = read_order(path, self.mapping, issues)
+            except Exception as e:
+                # Cualquier falla (p. ej. un .xlsx dañado: BadZipFile) rechaza solo
+                # ese pedido; los demás del lote siguen
+                self._reject(path, name, [f"No se pudo leer: {e}"])
+                continue
+            if has_errors(issues):
+                self._reject(path, name, [str(issue) for issue in issues])
+                continue
+            if not file_records:
+                self._reject(path, name, ["La lista de etiquetas está vacía."])
+                continue
+            records.extend(file_records)
+            accepted.append((path, name))
+        if not records:
+            return
+        try:
+            data, job = self.service.run('pdf', records, self.options)
+        except Exception as e:
+            for path, name in accepted:
+                self._reject(path, name, [f"No se pudo generar: {e}"])
+            return
+        self.batches += 1
+        stem = os.path.splitext(accepted[0][1])[0] if len(accepted) == 1 else 'lote'
+        output = unique_path(self.outbox, f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}.pdf")
+        tmp = output + '.part'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, output)
+        day = os.path.join(self.archive, time.strftime('%Y-%m-%d'))
+        os.makedirs(day, exist_ok=True)
+        for path, name in accepted:
+            os.replace(path, unique_path(day, name))
+        done = time.monotonic()
+        render_s = done - start
+        log.info("Lote %s: %d pedidos, %d etiquetas, %d páginas en %.2f s (%.0f etiq/s); "
+                 "espera desde el primer pedido %.1f s; en cola: %d",
+                 os.path.basename(output), len(accepted), job.labels, job.pages, render_s,
+                 job.labels / render_s if render_s > 0 else 0, done - batch.first_seen, self._queue.qsize())
+
+    def _reject(self, path, name, problems):
+        errors = os.path.join(self.archive, ERRORS_DIR)
+        os.makedirs(errors, exist_ok=True)
+        target = unique_path(errors, name)
+        os.replace(path, target)
+        with open(target + '.errores.txt', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(problems) + '\n')
+        log.warning("Pedido %s rechazado (%d problemas); ver %s", name, len(problems), target + '.errores.txt')
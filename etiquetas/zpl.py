@@ -0,0 +1,209 @@
+import os
+import socket
+from contextlib import contextmanager
+
+from reportlab.lib.units import mm
+
+from .layout import TITLE_FONT, TITLE_LEADING, TITLE_MIN_SIZE, fit_title, text_width
+from .profiling import timer_from_env
+from .records import Record, check_record, parse_line
+from .render import ICON_SIZE, LABEL_H, LABEL_W, LOGO_SIZE, RenderCancelled, RenderResult, \
+    barcode_generator, load_print_image
+
+ZPL_DPIS = (203, 300)
+ZPL_PORT = 9100
+# Fuente escalable residente de las Zebra (CG Triumvirate, métricas como Helvetica)
+ZPL_FONT = '0'
+LOGO_GRAPHIC = 'R:ETQLOGO.GRF'
+ICON_GRAPHIC = 'R:ETQICON.GRF'
+# Cada cuántos formatos se informa el avance
+PROGRESS_EVERY = 10
+
+
+def zpl_escape(text):
+    # Con ^FH los caracteres de control de ZPL se mandan en hexadecimal
+    return text.replace('_', '_5F').replace('^', '_5E').replace('~', '_7E')
+
+
+def graphic_command(name, img, width, height):
+    # ~DG con la imagen reducida a width × height puntos de la impresora, en
+    # blanco y negro (1 = punto negro, filas completadas a bytes)
+    from PIL import Image, ImageOps
+    if img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
+        img = img.convert('RGBA')
+        background = Image.new('RGBA', img.size, 'white')
+        img = Image.alpha_composite(background, img)
+    img = img.convert('L')
+    img.thumbnail((max(1, width), max(1, height)), Image.LANCZOS)
+    bits = ImageOps.invert(img).convert('1')
+    row_bytes = (bits.width + 7) // 8
+    data = bits.tobytes()
+    return f"~DG{name},{len(data)},{row_bytes},{data.hex().upper()}\n", bits.width, bits.height
+
+
+@contextmanager
+def open_zpl_output(target):
+    # 'tcp://host:puerto' manda el ZPL directo a la impresora (puerto 9100 por
+    # defecto); cualquier otro valor es la ruta de un archivo
+    if target.startswith('tcp://'):
+        host, _, port = target[len('tcp://'):].rstrip('/').partition(':')
+        with socket.create_connection((host, int(port or ZPL_PORT)), timeout=30) as sock:
+            with sock.makefile('wb') as f:
+                yield f
+    else:
+        with open(target, 'wb') as f:
+            yield f
+
+
+class ZplRenderer:
+    # Genera la misma etiqueta en ZPL para impresoras Zebra de rollo: códigos
+    # de barras con los comandos nativos (^BE/^BC), logo e icono descargados una
+    # vez como gráficos y un formato ^XA...^XZ por etiqueta, con ^PQ para las copias.
+    def __init__(self, logo=None, icon=None, dpi=203, timer=None):
+        if dpi not in ZPL_DPIS:
+            raise ValueError(f"Resolución ZPL no soportada: {dpi} (use {' o '.join(map(str, ZPL_DPIS))})")
+        self.timer = timer if timer is not None else timer_from_env()
+        self.dpi = dpi
+        with self.timer.stage('assets'):
+            self.logo = self._load_asset(logo, LOGO_SIZE)
+            self.icon = self._load_asset(icon, ICON_SIZE)
+        self._graphics = None
+
+    def _load_asset(self, asset, size):
+        if isinstance(asset, (str, os.PathLike)):
+            return load_print_image(asset, size, size, dpi=self.dpi)
+        return asset
+
+    def dots(self, points):
+        return round(points * self.dpi / 72)
+
+    def graphics_commands(self):
+        # Comandos ~DG del logo y el icono, más su tamaño final en puntos de impresora
+        commands = []
+        self._graphics = {}
+        for name, img, size in ((LOGO_GRAPHIC, self.logo, LOGO_SIZE), (ICON_GRAPHIC, self.icon, ICON_SIZE)):
+            if img is not None:
+                command, w, h = graphic_command(name, img, self.dots(size), self.dots(size))
+                commands.append(command)
+                self._graphics[name] = (w, h)
+        return ''.join(commands)
+
+    def render(self, lines, output, progress=None, cancel=None):
+        # output es una ruta o 'tcp://host:puerto'; los formatos se escriben a
+        # medida que se generan, sin armar el trabajo completo en memoria
+        result = RenderResult()
+        result.outputs.append(output)
+        try:
+            with open_zpl_output(output) as f:
+                with self.timer.stage('graphics'):
+                    f.write(self.graphics_commands().encode('ascii'))
+                for line_no, item in enumerate(lines, 1):
+                    if not isinstance(item, Record):
+                        if not item.strip():
+                            continue
+                        with self.timer.stage('parse'):
+                            item = parse_line(item, line_no)
+                    check_record(item)
+                    if cancel is not None and cancel.is_set():
+                        raise RenderCancelled()
+                    with self.timer.stage('format'):
+                        f.write(self.label_format(item).encode('utf-8'))
+                    result.pages += 1
+                    result.labels += item.quantity
+                    if progress and result.pages % PROGRESS_EVERY == 0:
+                        progress(result.labels)
+        except RenderCancelled:
+            if not output.startswith('tcp://') and os.path.exists(output):
+                os.remove(output)
+            raise
+        if progress:
+            progress(result.labels)
+        result.timer = self.timer
+        return result
+
+    def label_format(self, record):
+        # Misma disposición que LabelRenderer._draw_label, medida desde arriba
+        # a la izquierda como en ZPL
+        if self._graphics is None:
+            self.graphics_commands()
+        code, title, price, symbology = record[:4]
+        out = [f"^XA^CI28^PW{self.dots(LABEL_W)}^LL{self.dots(LABEL_H)}^LH0,0\n",
+               f"^FO0,0^GB{self.dots(LABEL_W)},{self.dots(LABEL_H)},2^FS\n",
+               f"^FO{self.dots(LABEL_W/2)},0^GB2,{self.dots(LABEL_H)},2^FS\n"]
+        self._left_column(out)
+
+        block_x = LABEL_W / 2
+        block_w = LABEL_W / 2
+        center = block_x + block_w/2
+        current_y = 6*mm
+        if price:
+            self._text(out, center, current_y, f"${price}", 13)
+            current_y += 5*mm
+
+        available_height = (LABEL_H - current_y) - 18*mm
+        if available_height < TITLE_MIN_SIZE + TITLE_LEADING:
+            available_height = TITLE_MIN_SIZE + TITLE_LEADING
+        size, title_lines = fit_title(title, block_w - 7*mm, available_height)
+        for text_line in title_lines:
+            self._text(out, center, current_y, text_line, size, font=TITLE_FONT)
+            current_y += size + TITLE_LEADING
+        current_y += 2*mm
+
+        self._barcode(out, code, symbology, block_x, current_y - 2*mm, block_w - 8*mm, 12*mm)
+        if record.quantity > 1:
+            out.append(f"^PQ{record.quantity}\n")
+        out.append("^XZ\n")
+        return ''.join(out)
+
+    def _left_column(self, out):
+        center = LABEL_W / 4
+        phones = ['712 162 6915', '712 159 0891']
+        if LOGO_GRAPHIC in self._graphics:
+            w = self._graphics[LOGO_GRAPHIC][0]
+            out.append(f"^FO{self.dots(center) - w//2},{self.dots(2*mm)}^XG{LOGO_GRAPHIC},1,1^FS\n")
+            text_y = 2*mm + LOGO_SIZE + 4*mm
+        else:
+            text_y = 10*mm
+        text_y = min(text_y, LABEL_H - 12*mm)
+
+        self._text(out, center, text_y, 'TIMILPAN Y ACULCO', 9, font='Helvetica-Bold')
+        text_y += 5*mm
+        self._text(out, center, text_y, 'mueblescarrillo59@gmail.com', 7)
+        text_y += 5*mm
+
+        needed_height = len(phones) * (ICON_SIZE + 2*mm)
+        spacing = ICON_SIZE + 1*mm if (LABEL_H - text_y) - needed_height < 4*mm else 4*mm
+        for phone in phones:
+            if ICON_GRAPHIC in self._graphics:
+                icon_x = center - text_width(phone, 'Helvetica', 8)/2 - ICON_SIZE - 1*mm
+                out.append(f"^FO{self.dots(icon_x)},{self.dots(text_y - ICON_SIZE/2)}"
+                           f"^XG{ICON_GRAPHIC},1,1^FS\n")
+                self._text(out, icon_x + ICON_SIZE + 1*mm, text_y, phone, 8, centered=False)
+            else:
+                self._text(out, center, text_y, phone, 8)
+            text_y += spacing
+
+    def _text(self, out, x, baseline, text, size, font='Helvetica', centered=True):
+        # ^FT ubica el texto por su línea base; el centrado se calcula con las
+        # métricas de Helvetica, que la fuente 0 de la impresora sigue de cerca
+        if centered:
+            x -= text_width(text, font, size) / 2
+        h = self.dots(size)
+        out.append(f"^FT{self.dots(x)},{self.dots(baseline)}^A{ZPL_FONT}N,{h}"
+                   f"^FH^FD{zpl_escape(text)}^FS\n")
+
+    def _barcode(self, out, code, symbology, block_x, top, max_w, height):
+        # Ancho de módulo entero en puntos, el mayor con el que el código (con
+        # sus zonas de silencio) cabe en max_w; centrado en la columna derecha
+        generator, code = barcode_generator(code)
+        modules = len(generator.build()[0]) + 20
+        module = max(1, min(4, self.dots(max_w) // modules))
+        x = self.dots(block_x + LABEL_W/4) - (modules - 20) * module // 2
+        out.append(f"^FO{x},{self.dots(top)}^BY{module}\n")
+        if symbology == 'ean13':
+            # La impresora calcula el dígito verificador a partir de los 12 primeros
+            out.append(f"^BEN,{self.dots(height)},Y,N^FD{code[:12]}^FS\n")
+        else:
+            # En ^BC '>' inicia un código de control; '><' es el carácter literal
+            data = zpl_escape(code).replace('>', '><')
+            out.append(f"^BCN,{self.dots(height)},Y,N,N^FH^FD{data}^FS\n")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Las pruebas corren contra el árbol del repositorio, sin instalar el paquete
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+from PIL import Image
+
+from etiquetas.incremental import FRAGMENT_EXT, render_incremental
+from etiquetas.pdfpages import link_pages, read_fragment, split_pages, write_fragment
+from etiquetas.render import LabelRenderer
+
+LINES = [f"A{i:05d};Mesa de centro {i};{100 + i}" for i in range(45)]
+
+
+@pytest.fixture
+def renderer():
+    return LabelRenderer(logo=Image.new('RGB', (300, 300), 'red'))
+
+
+def page_texts(path):
+    pypdf = pytest.importorskip('pypdf')
+    return [page.extract_text() for page in pypdf.PdfReader(path, strict=True).pages]
+
+
+def test_split_and_link_round_trip(tmp_path, renderer):
+    source = str(tmp_path / 'fuente.pdf')
+    renderer.render(LINES, source)
+    fragments = split_pages(source)
+    write_fragment(str(tmp_path / 'pagina'), fragments[0])
+    assert read_fragment(str(tmp_path / 'pagina')) == fragments[0]
+    output = str(tmp_path / 'unido.pdf')
+    assert link_pages(fragments, output) == 5
+    assert page_texts(output) == page_texts(source)
+
+
+def test_link_writes_shared_objects_once(tmp_path, renderer):
+    first, second = str(tmp_path / 'a.pdf'), str(tmp_path / 'b.pdf')
+    renderer.render(LINES[:10], first)
+    renderer.render(LINES[10:20], second)
+    output = str(tmp_path / 'unido.pdf')
+    link_pages(split_pages(first) + split_pages(second), output)
+    with open(output, 'rb') as f:
+        assert f.read().count(b'/Subtype /Image') == 1
+
+
+def test_edit_redraws_only_the_changed_page(tmp_path, renderer):
+    cache = str(tmp_path / 'cache')
+    output = str(tmp_path / 'salida.pdf')
+    result = render_incremental(renderer, LINES, output, cache_dir=cache)
+    assert (result.pages, result.reused_pages) == (5, 0)
+    lines = list(LINES)
+    lines[22] = "A00022;Mesa editada;999"
+    result = render_incremental(renderer, lines, output, cache_dir=cache)
+    assert (result.pages, result.reused_pages, result.labels) == (5, 4, 45)
+    plain = str(tmp_path / 'normal.pdf')
+    renderer.render(lines, plain)
+    assert page_texts(output) == page_texts(plain)
+    assert len([name for name in os.listdir(cache) if name.endswith(FRAGMENT_EXT)]) == 6
@@ -0,0 +1,86 @@
+import pytest
+
+from etiquetas.records import PRICE_RE, Record, check_record, ean13_checksum, has_errors, iter_records, parse_line, \
+    parse_records
+
+
+@pytest.mark.parametrize('digits, expected', [
+    ('750123456789', 3),
+    ('400638133393', 1),
+    ('590123412345', 7),
+    ('000000000000', 0),
+])
+def test_ean13_checksum(digits, expected):
+    assert ean13_checksum(digits) == expected
+
+
+@pytest.mark.parametrize('price', ['10', '1299', '10.5', '10.50', '1,200', '1,200.50', '12,345,678'])
+def test_price_re_accepts(price):
+    assert PRICE_RE.match(price)
+
+
+@pytest.mark.parametrize('price', ['abc', '$10', '10.505', '1,20', '1,2000', '10.', '.5', '1 200', '-5'])
+def test_price_re_rejects(price):
+    assert not PRICE_RE.match(price)
+
+
+def test_missing_code_is_reported_and_dropped():
+    records, issues = parse_records(['7501234567893;Silla;10', ';SinCodigo;12'])
+    assert [record.code for record in records] == ['7501234567893']
+    assert [(issue.line_no, issue.severity) for issue in issues] == [(2, 'error')]
+    assert 'falta el código' in issues[0].message
+
+
+def test_bad_ean13_check_digit_is_dropped():
+    # python-barcode corregiría el dígito y las barras no coincidirían con el número impreso
+    records, issues = parse_records(['7501234567890;Mesa;10'])
+    assert records == []
+    assert has_errors(issues)
+    assert 'debería ser 3' in issues[0].message
+
+
+def test_error_rows_are_dropped_without_issue_list():
+    records = list(iter_records(['ABC;Mesa;abc', 'DEF;Silla;10;0', 'GHI;Cama;10']))
+    assert [record.code for record in records] == ['GHI']
+
+
+def test_duplicates_warn_but_keep_both_rows():
+    records, issues = parse_records(['ABC;Mesa;10', '', 'ABC;Mesa grande;12'])
+    assert [record.line_no for record in records] == [1, 3]
+    assert [(issue.line_no, issue.severity) for issue in issues] == [(3, 'warning')]
+    assert 'ya está en la línea 1' in issues[0].message
+    assert not has_errors(issues)
+
+
+def test_long_code128_is_truncated_with_warning():
+    records, issues = parse_records(['ABCDEFGHIJKLMNOPQRST;Mesa;10'])
+    assert records[0].code == 'ABCDEFGHIJKLMNO'
+    assert [issue.severity for issue in issues] == ['warning']
+
+
+def test_check_record_names_the_line():
+    with pytest.raises(ValueError, match='Línea 4: falta el código'):
+        check_record(Record('', 'Mesa', '10', 'code128', 4))
+    record = Record('7501234567893', 'Mesa', '10', 'ean13', 1)
+    assert check_record(record) is record
+
+
+def test_renderer_rejects_unprintable_lines(tmp_path):
+    from etiquetas import LabelRenderer
+    with pytest.raises(ValueError, match='Línea 3: falta el código'):
+        LabelRenderer().render(['7501234567893;Silla;10', '', ';SinCodigo;12'], str(tmp_path / 'out.pdf'))
+
+
+@pytest.mark.parametrize('quantity', ['abc', '0', '-3', '1.5'])
+def test_invalid_quantity_is_rejected_for_raw_lines(quantity):
+    record = parse_line(f'ABC;Mesa;10;{quantity}', 2)
+    with pytest.raises(ValueError, match='Línea 2: cantidad inválida'):
+        check_record(record)
+
+
+def test_renderers_reject_invalid_quantity(tmp_path):
+    from etiquetas import LabelRenderer
+    from etiquetas.zpl import ZplRenderer
+    for renderer, name in ((LabelRenderer(), 'out.pdf'), (ZplRenderer(), 'out.zpl')):
+        with pytest.raises(ValueError, match='Línea 2: cantidad inválida'):
+            renderer.render(['ABC;Mesa;10;3', 'DEF;Silla;12;-3'], str(tmp_path / name))
@@ -0,0 +1,44 @@
+import os
+import random
+
+from etiquetas.records import Record
+from etiquetas.render import BARCODE_CACHE_SIZE, LabelRenderer, RenderResult
+
+LINES = [f"A{i:05d};Mesa de centro {i};{100 + i}" for i in range(40)]
+
+
+def test_draft_profile_makes_smaller_files_with_a_large_logo(tmp_path):
+    from PIL import Image
+    # Ruido: una foto de teléfono no se comprime casi nada
+    logo = Image.frombytes('RGB', (2000, 2000), random.Random(0).randbytes(2000 * 2000 * 3))
+    per_label = {}
+    for profile in ('draft', 'production'):
+        result = LabelRenderer(logo=logo, print_profile=profile).render(LINES, str(tmp_path / f'{profile}.pdf'))
+        per_label[profile] = result.bytes_per_label
+    assert per_label['draft'] < per_label['production']
+
+
+def test_bytes_per_label(tmp_path):
+    result = LabelRenderer().render(LINES, str(tmp_path / 'out.pdf'))
+    assert result.bytes_per_label == os.path.getsize(tmp_path / 'out.pdf') / 40
+
+
+def test_bytes_per_label_without_output_file():
+    # ZPL enviado directo a la impresora: no hay archivo que medir
+    result = RenderResult()
+    result.outputs.append('tcp://192.168.1.50:9100')
+    result.labels = 3
+    assert result.bytes_per_label is None
+
+
+def test_plan_follows_the_barcode_cache():
+    records = [Record(f"A{i:05d}", "Mesa", "10", 'code128', i) for i in range(BARCODE_CACHE_SIZE + 1)]
+    plan = LabelRenderer(prefetch=8)._plan(records + records[:1] + records[-1:])
+    # El primero ya salió del LRU y hay que volver a codificarlo; el último sigue
+    assert [encode for _, encode in plan][-2:] == [True, False]
+
+
+def test_plan_starts_over_in_each_file():
+    record = Record("ABC", "Mesa", "10", 'code128', 1)
+    plan = LabelRenderer(prefetch=8)._plan([record._replace(quantity=2)] * 4, labels_per_file=4)
+    assert [encode for _, encode in plan] == [True, False, True, False]
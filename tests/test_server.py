@@ -0,0 +1,77 @@
+import http.client
+import threading
+
+import pytest
+
+from etiquetas import server, sources
+from etiquetas.records import parse_records
+from etiquetas.server import LabelServer, LabelService
+from etiquetas.sources import ColumnMapping
+
+
+@pytest.fixture
+def service():
+    service = LabelService(workers=1)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def address(service):
+    httpd = LabelServer(('127.0.0.1', 0), service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(address, headers, body=b''):
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    conn.putrequest('POST', '/render')
+    for name, value in headers.items():
+        conn.putheader(name, value)
+    conn.endheaders(body)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status
+
+
+def test_missing_content_length_is_rejected(address):
+    assert post(address, {}) == 411
+
+
+@pytest.mark.parametrize('length', ['abc', '-1', '1.5'])
+def test_invalid_content_length_is_rejected(address, length):
+    assert post(address, {'Content-Length': length}) == 400
+
+
+def test_empty_body_is_rejected(address):
+    assert post(address, {'Content-Length': '0'}) == 400
+
+
+def test_submit_frees_the_slot_when_the_job_cannot_be_built(service, monkeypatch):
+    def fail(records, size):
+        raise RuntimeError("sin disco")
+    monkeypatch.setattr(server, 'iter_shards', fail)
+    records, _ = parse_records(['ABC;Mesa;10'])
+    for _ in range(service.max_jobs + 1):
+        with pytest.raises(RuntimeError):
+            service.submit('zpl', records, service.options('zpl', {}))
+    assert service.metrics()['jobs_active'] == 0
+    assert service.rejected == 0
+
+
+def test_large_pdf_job_is_joined(service):
+    records, _ = parse_records([f'A{i:05d};Mesa {i};10' for i in range(120)])
+    data, job = service.run('pdf', records, service.options('pdf', {}))
+    assert len(job.shards) > 1
+    assert data.startswith(b'%PDF') and data.count(b'/Type /Page\n') == job.pages == 12
+
+
+def test_body_ignores_the_mapping_saved_by_the_gui(monkeypatch):
+    monkeypatch.setattr(sources, 'load_mapping', lambda: ColumnMapping('sku', 'nombre', 'otro'))
+    body = 'sku,nombre,precio,otro\nABC,Mesa,10,x\n'.encode()
+    records = server.parse_body('text/csv', body)
+    assert [(record.code, record.price) for record in records] == [('ABC', '10')]
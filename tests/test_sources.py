@@ -0,0 +1,41 @@
+import sqlite3
+
+import pytest
+
+from etiquetas.cli import main
+from etiquetas.sources import iter_table_records, read_table, sqlite_tables
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'lista.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (codigo TEXT, titulo TEXT, precio TEXT)")
+        conn.execute("INSERT INTO t VALUES ('ABC', 'Mesa', '10')")
+    return path
+
+
+def test_sqlite_records(database):
+    assert [record.code for record in iter_table_records(database)] == ['ABC']
+
+
+def test_bad_query_is_a_value_error(database):
+    with pytest.raises(ValueError, match='lista.db'):
+        read_table(database, query='SELECT nope FROM t')
+
+
+def test_corrupt_files_are_value_errors(tmp_path):
+    pytest.importorskip('openpyxl')
+    for name in ('dañado.xlsx', 'dañado.db'):
+        path = tmp_path / name
+        path.write_bytes(b'esto no es una planilla' * 100)
+        with pytest.raises(ValueError, match=name):
+            if name.endswith('.db'):
+                sqlite_tables(str(path))
+            else:
+                read_table(str(path))
+
+
+def test_check_reports_reader_errors_without_traceback(database, capsys):
+    assert main(['check', database, '--query', 'SELECT nope FROM t']) == 1
+    assert capsys.readouterr().err.startswith('Error: No se pudo leer lista.db')
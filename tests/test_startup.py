@@ -0,0 +1,38 @@
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location('bench_startup', os.path.join(ROOT, 'benchmarks', 'bench_startup.py'))
+bench_startup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_startup)
+
+# Solo el import (sin ventana); holgado para máquinas de CI lentas
+IMPORT_TARGET_MS = 200
+
+SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import etiquetas.app
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'import_ms': elapsed,
+                  'loaded': [name for name in {bench_startup.HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def import_app():
+    # Intérprete nuevo: en este proceso pytest ya cargó medio paquete
+    proc = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def test_app_import_is_light():
+    pytest.importorskip('tkinter')
+    runs = [import_app() for _ in range(3)]
+    assert sorted({name for run in runs for name in run['loaded']}) == []
+    assert statistics.median(run['import_ms'] for run in runs) < IMPORT_TARGET_MS
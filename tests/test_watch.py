@@ -0,0 +1,32 @@
+import os
+import time
+
+import pytest
+
+from etiquetas.server import LabelService
+from etiquetas.watch import Batch, FolderWatcher
+
+
+@pytest.fixture
+def service():
+    service = LabelService(workers=1)
+    yield service
+    service.close()
+
+
+def test_bad_order_does_not_strand_the_rest_of_its_batch(tmp_path, service):
+    inbox, outbox, archive = tmp_path / 'entrada', tmp_path / 'salida', tmp_path / 'archivo'
+    inbox.mkdir()
+    watcher = FolderWatcher(service, str(inbox), str(outbox), str(archive))
+    batch = Batch()
+    for name, data in (('malo.xlsx', b'esto no es un zip'), ('bueno.txt', b'ABC;Mesa;10\n')):
+        path = os.path.join(watcher.work, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        batch.files.append((path, name, time.monotonic()))
+    watcher._render_batch(batch)
+    assert os.listdir(watcher.work) == []
+    assert len(os.listdir(outbox)) == 1
+    assert os.path.exists(archive / 'errores' / 'malo.xlsx')
+    day, = [entry for entry in os.listdir(archive) if entry != 'errores']
+    assert os.listdir(archive / day) == ['bueno.txt']